@@ -0,0 +1,164 @@
+import asyncio
+import contextvars
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import suppress
+from functools import update_wrapper
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIHandler
+from django.db import close_old_connections, connections
+from rest_framework.permissions import SAFE_METHODS
+
+# Свой пул, чтобы чтения не стояли в очереди к единственному потоку,
+# где Django 3.2 под ASGI выполняет весь синхронный код.
+read_executor = ThreadPoolExecutor(
+    max_workers=settings.ASYNC_READ_WORKERS, thread_name_prefix='api-read'
+)
+
+
+def handle_read(view, request, *args, **kwargs):
+    """Выполняет чтение целиком в потоке пула, вместе с рендерингом.
+
+    У потоков пула свои соединения с базой, а request_finished
+    закрывает только соединения основного потока, поэтому устаревшие
+    соединения пула закрываются здесь.
+    """
+    close_old_connections()
+    try:
+        response = view(request, *args, **kwargs)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+    finally:
+        close_old_connections()
+
+
+class ThreadedIterator:
+    """Перебирает iterable в отдельном потоке, отдавая части через очередь.
+
+    Перебор — через async for: часть ожидается в пуле потоков, и цикл
+    событий тем временем обслуживает другие запросы. Генератор целиком
+    выполняется в одном потоке, поэтому курсор .iterator() остаётся
+    в своём соединении, а поток получает копию contextvars того, кто
+    начал перебор. Если перебор прерван, например клиент отключился,
+    поток останавливается на следующей части.
+    """
+    done = object()
+
+    def __init__(self, iterable, buffer=2):
+        self.iterable = iterable
+        self.parts = queue.Queue(maxsize=buffer)
+        self.stopped = threading.Event()
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            with suppress(queue.Full):
+                self.parts.put(item, timeout=0.1)
+                return True
+        return False
+
+    def get(self):
+        while not self.stopped.is_set():
+            with suppress(queue.Empty):
+                return self.parts.get(timeout=0.1)
+        return self.done
+
+    def produce(self):
+        try:
+            for part in self.iterable:
+                if not self.put(part):
+                    return
+            self.put(self.done)
+        except Exception as error:
+            self.put(error)
+        finally:
+            connections.close_all()
+
+    async def __aiter__(self):
+        context = contextvars.copy_context()
+        threading.Thread(
+            target=context.run, args=(self.produce,), daemon=True
+        ).start()
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                item = await loop.run_in_executor(None, self.get)
+                if item is self.done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            self.stopped.set()
+
+
+class StreamingASGIHandler(ASGIHandler):
+    """ASGIHandler, который перебирает потоковые ответы вне цикла событий.
+
+    Django 3.2 перебирает StreamingHttpResponse прямо в цикле событий:
+    ORM там недоступен, а пока генератор ждёт базу, стоят все запросы
+    процесса. Здесь ответ перебирает ThreadedIterator, а цикл только
+    отправляет готовые части.
+    """
+
+    async def send_response(self, response, send):
+        if not response.streaming:
+            return await super().send_response(response, send)
+        # Заголовки собираются так же, как в ASGIHandler.send_response.
+        headers = []
+        for header, value in response.items():
+            if isinstance(header, str):
+                header = header.encode('ascii')
+            if isinstance(value, str):
+                value = value.encode('latin1')
+            headers.append((bytes(header), bytes(value)))
+        for cookie in response.cookies.values():
+            headers.append((
+                b'Set-Cookie',
+                cookie.output(header='').encode('ascii').strip(),
+            ))
+        await send({
+            'type': 'http.response.start',
+            'status': response.status_code,
+            'headers': headers,
+        })
+        async for part in ThreadedIterator(response):
+            for chunk, _ in self.chunk_bytes(part):
+                await send({
+                    'type': 'http.response.body',
+                    'body': chunk,
+                    'more_body': True,
+                })
+        await send({'type': 'http.response.body'})
+        await sync_to_async(response.close, thread_sensitive=True)()
+
+
+class AsyncReadMixin:
+    """Асинхронные обработчики безопасных запросов под ASGI.
+
+    В Django 3.2 нет асинхронного ORM, а DRF не поддерживает async
+    обработчики, поэтому list, retrieve и прочие GET выполняются целиком,
+    с аутентификацией, правами и пагинацией, одним переходом в пул
+    read_executor. Запросы идут параллельно, а не друг за другом в
+    общем потоке. Запись остаётся на обычном пути Django. Без
+    ASYNC_READS, например под WSGI, представление остаётся синхронным.
+    """
+
+    @classmethod
+    def as_view(cls, actions=None, **initkwargs):
+        view = super().as_view(actions, **initkwargs)
+        if not settings.ASYNC_READS:
+            return view
+
+        async def async_view(request, *args, **kwargs):
+            if request.method in SAFE_METHODS:
+                return await sync_to_async(
+                    handle_read, thread_sensitive=False,
+                    executor=read_executor,
+                )(view, request, *args, **kwargs)
+            return await sync_to_async(view)(request, *args, **kwargs)
+
+        return update_wrapper(async_view, view)
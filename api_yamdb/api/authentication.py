@@ -0,0 +1,47 @@
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.settings import api_settings
+
+CACHED_USER_FIELDS = ('id', 'username', 'email', 'first_name', 'last_name',
+                      'bio', 'role', 'is_active', 'is_staff', 'is_superuser')
+
+
+def user_cache_key(user_id):
+    return f'jwt-user:{user_id}'
+
+
+def invalidate_cached_user(user_id):
+    cache.delete(user_cache_key(user_id))
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """JWT-аутентификация с кешированием пользователя для чтения.
+
+    На безопасных запросах пользователь собирается из кеша без обращения
+    к базе. Такой объект не содержит пароля и не должен сохраняться,
+    поэтому запросы на запись всегда получают пользователя из базы.
+    """
+
+    def authenticate(self, request):
+        self.use_cache = request.method in SAFE_METHODS
+        return super().authenticate(request)
+
+    def get_user(self, validated_token):
+        user_id = validated_token.get(api_settings.USER_ID_CLAIM)
+        if not self.use_cache or user_id is None:
+            return super().get_user(validated_token)
+        key = user_cache_key(user_id)
+        data = cache.get(key)
+        if data is None:
+            user = super().get_user(validated_token)
+            cache.set(
+                key,
+                {field: getattr(user, field) for field in CACHED_USER_FIELDS},
+                settings.JWT_USER_CACHE_TIMEOUT,
+            )
+            return user
+        user = self.user_model(**data)
+        user._state.adding = False
+        return user
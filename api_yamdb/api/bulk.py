@@ -0,0 +1,220 @@
+from api.permissions import IsAdmin
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Max
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework.validators import UniqueValidator
+
+NOT_FOUND_ERROR = 'Объект не найден.'
+DUPLICATE_ERROR = 'Значение повторяется или уже существует.'
+LOOKUP_TYPES = (int, str)
+
+
+def insert_all(model, objects):
+    """bulk_create, после которого у объектов есть первичные ключи.
+
+    SQLite в Django 3.2 не возвращает id из bulk_create. Там id
+    восстанавливаются после вставки: с первого INSERT транзакция держит
+    блокировку записи, а AUTOINCREMENT выдаёт id подряд, поэтому объекты
+    без заданного pk получают последние len(objects) id по порядку.
+    """
+    using = router.db_for_write(model)
+    if connections[using].features.can_return_rows_from_bulk_insert:
+        return model.objects.using(using).bulk_create(objects)
+    if not objects:
+        return objects
+    # Max берётся из той же базы, иначе роутер отправил бы его на реплику.
+    with transaction.atomic(using=using):
+        model.objects.using(using).bulk_create(objects)
+        last = model.objects.using(using).aggregate(
+            last=Max('pk')
+        )['last']
+    for pk, obj in enumerate(objects, last - len(objects) + 1):
+        obj.pk = pk
+    return objects
+
+
+class BulkWriteMixin:
+    """Пакетные POST, PATCH и DELETE на /<ресурс>/bulk/.
+
+    Весь пакет проверяется целиком и пишется в одной транзакции; при
+    ошибках возвращается 400 со списком ошибок по позициям пакета.
+    Связанные объекты по slug загружаются одним запросом на поле.
+    """
+    bulk_lookup_field = 'id'
+    # Поле сериализатора -> модель, объекты которой ищутся по slug.
+    bulk_related_fields = {}
+    # Поля, уникальность которых проверяется для пакета одним запросом.
+    bulk_unique_fields = ()
+
+    @action(detail=False, methods=['post', 'patch', 'delete'],
+            permission_classes=(IsAdmin,))
+    def bulk(self, request):
+        items = request.data
+        if not isinstance(items, list) or not items:
+            return Response(
+                ['Ожидается непустой список.'],
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(items) > settings.BULK_MAX_ITEMS:
+            return Response(
+                [f'Не больше {settings.BULK_MAX_ITEMS} объектов за запрос.'],
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        handler = {
+            'POST': self.bulk_create,
+            'PATCH': self.bulk_update,
+            'DELETE': self.bulk_destroy,
+        }[request.method]
+        with transaction.atomic():
+            return handler(items)
+
+    def get_bulk_serializer(self, *args, **kwargs):
+        kwargs['context'] = self.get_bulk_context()
+        serializer = self.get_serializer_class()(*args, **kwargs)
+        # Уникальность проверяет find_duplicates одним запросом на пакет.
+        fields = getattr(serializer, 'child', serializer).fields
+        for name in self.bulk_unique_fields:
+            fields[name].validators = [
+                validator for validator in fields[name].validators
+                if not isinstance(validator, UniqueValidator)
+            ]
+        return serializer
+
+    def get_bulk_result(self, objects):
+        """Записанные объекты, перечитанные через queryset ViewSet'а."""
+        found = self.get_queryset().in_bulk([obj.pk for obj in objects])
+        return [found[obj.pk] for obj in objects]
+
+    def get_bulk_context(self):
+        if hasattr(self, '_bulk_context'):
+            return self._bulk_context
+        context = self.get_serializer_context()
+        related = {}
+        for field, model in self.bulk_related_fields.items():
+            slugs = set()
+            for item in self.request.data:
+                value = item.get(field) if isinstance(item, dict) else None
+                values = value if isinstance(value, list) else [value]
+                slugs.update(slug for slug in values if isinstance(slug, str))
+            related[model] = model.objects.in_bulk(
+                slugs, field_name='slug'
+            )
+        context['related_objects'] = related
+        self._bulk_context = context
+        return context
+
+    def get_bulk_model(self):
+        return self.get_queryset().model
+
+    def find_duplicates(self, rows):
+        """Ошибки по позициям для повторов в пакете и в базе."""
+        errors = [{} for _ in rows]
+        for name in self.bulk_unique_fields:
+            values = [row.get(name) for row in rows]
+            existing = set(self.get_bulk_model().objects.filter(
+                **{f'{name}__in': values}
+            ).values_list(name, flat=True))
+            seen = set()
+            for error, value in zip(errors, values):
+                if value in existing or value in seen:
+                    error[name] = [DUPLICATE_ERROR]
+                seen.add(value)
+        return errors
+
+    def bulk_create(self, items):
+        serializer = self.get_bulk_serializer(data=items, many=True)
+        if not serializer.is_valid():
+            return Response(
+                serializer.errors, status=status.HTTP_400_BAD_REQUEST
+            )
+        errors = self.find_duplicates(serializer.validated_data)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        objects = self.perform_bulk_create(serializer.validated_data)
+        return Response(
+            self.get_bulk_serializer(
+                self.get_bulk_result(objects), many=True
+            ).data,
+            status=status.HTTP_201_CREATED
+        )
+
+    def perform_bulk_create(self, rows):
+        model = self.get_bulk_model()
+        return insert_all(model, [model(**row) for row in rows])
+
+    def bulk_update(self, items):
+        lookup = self.bulk_lookup_field
+        keys = [item.get(lookup) if isinstance(item, dict) else None
+                for item in items]
+        instances = self.get_bulk_model().objects.in_bulk(
+            [key for key in keys if isinstance(key, LOOKUP_TYPES)],
+            field_name=lookup
+        )
+        errors, changes = [], []
+        for item, key in zip(items, keys):
+            instance = instances.get(key) if isinstance(
+                key, LOOKUP_TYPES
+            ) else None
+            if instance is None:
+                errors.append({lookup: [NOT_FOUND_ERROR]})
+                continue
+            serializer = self.get_bulk_serializer(
+                instance, data=item, partial=True
+            )
+            if serializer.is_valid():
+                errors.append({})
+                changes.append((instance, serializer.validated_data))
+            else:
+                errors.append(serializer.errors)
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        objects = self.perform_bulk_update(changes)
+        return Response(
+            self.get_bulk_serializer(
+                self.get_bulk_result(objects), many=True
+            ).data,
+            status=status.HTTP_200_OK
+        )
+
+    def perform_bulk_update(self, changes):
+        model = self.get_bulk_model()
+        fields = set()
+        for instance, data in changes:
+            for name, value in data.items():
+                setattr(instance, name, value)
+                fields.add(name)
+        objects = [instance for instance, _ in changes]
+        fields.discard(self.bulk_lookup_field)
+        # bulk_update не вызывает pre_save, поэтому auto_now выставляется
+        # здесь, даже если менялись только связи многие-ко-многим.
+        now = timezone.now()
+        for field in model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False):
+                for instance in objects:
+                    setattr(instance, field.attname, now)
+                fields.add(field.name)
+        if fields:
+            model.objects.bulk_update(objects, fields)
+        return objects
+
+    def bulk_destroy(self, keys):
+        lookup = self.bulk_lookup_field
+        queryset = self.get_bulk_model().objects.filter(**{
+            f'{lookup}__in': [
+                key for key in keys if isinstance(key, LOOKUP_TYPES)
+            ]
+        })
+        found = set(queryset.values_list(lookup, flat=True))
+        errors = [{} if key in found else {lookup: [NOT_FOUND_ERROR]}
+                  for key in keys]
+        if any(errors):
+            return Response(errors, status=status.HTTP_400_BAD_REQUEST)
+        self.perform_bulk_destroy(queryset)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def perform_bulk_destroy(self, queryset):
+        queryset.delete()
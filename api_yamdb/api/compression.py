@@ -0,0 +1,100 @@
+import gzip
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_vary_headers
+from django.utils.deprecation import MiddlewareMixin
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+GZIP_LEVEL = 6
+# Качество 11 по умолчанию рассчитано на статику и слишком медленное
+# для ответов, которые сжимаются на каждый запрос.
+BROTLI_QUALITY = 5
+# В порядке предпочтения сервера при равных q.
+CODINGS = ('br', 'gzip') if brotli else ('gzip',)
+
+
+def compress(content, coding):
+    if coding == 'br':
+        return brotli.compress(content, quality=BROTLI_QUALITY)
+    # mtime=0 даёт одинаковые байты для одинакового ответа.
+    return gzip.compress(content, compresslevel=GZIP_LEVEL, mtime=0)
+
+
+def accepted_codings(header):
+    """Кодировки из Accept-Encoding с их q."""
+    codings = {}
+    for item in header.split(','):
+        coding, *params = item.split(';')
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition('=')
+            if name == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding.strip():
+            codings[coding.strip().lower()] = quality
+    return codings
+
+
+def negotiate(header):
+    """Лучшая из поддерживаемых кодировок или None."""
+    accepted = accepted_codings(header)
+    default = accepted.get('*', 0.0)
+    # max возвращает первую из равных, то есть предпочтительную.
+    quality, coding = max(
+        ((accepted.get(coding, default), coding) for coding in CODINGS),
+        key=lambda item: item[0],
+    )
+    return coding if quality > 0 else None
+
+
+class CompressionMiddleware(MiddlewareMixin):
+    """Сжимает ответы от COMPRESSION_MIN_SIZE байт в gzip или brotli.
+
+    Кодировка выбирается по Accept-Encoding; brotli используется, только
+    если пакет установлен. Если представление задало ответу
+    compressed_cache_key, сжатые байты хранятся в кеше под этим ключом
+    и горячие ответы не сжимаются повторно. Ключ должен однозначно
+    определять тело ответа.
+    """
+
+    def process_response(self, request, response):
+        if (
+            response.streaming
+            or response.has_header('Content-Encoding')
+            or len(response.content) < settings.COMPRESSION_MIN_SIZE
+        ):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        coding = negotiate(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if coding is None:
+            return response
+        content = self.compressed_content(response, coding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = coding
+        # Байты ответа изменились, поэтому сильный ETag становится слабым.
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = f'W/{etag}'
+        return response
+
+    def compressed_content(self, response, coding):
+        key = getattr(response, 'compressed_cache_key', None)
+        if key is None:
+            return compress(response.content, coding)
+        key = f'{key}:{coding}'
+        content = cache.get(key)
+        if content is None:
+            content = compress(response.content, coding)
+            cache.set(key, content, settings.COMPRESSION_CACHE_TIMEOUT)
+        return content
@@ -0,0 +1,54 @@
+from collections import defaultdict
+from itertools import chain, islice
+
+from api.renderers import FastJSONRenderer
+from api.serializers import CommentSerializer, ReviewSerializer
+from django.conf import settings
+from reviews.models import Comment
+from users.models import User
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def export_reviews(title, context, with_comments=False):
+    """NDJSON: по строке на отзыв, в порядке id.
+
+    Отзывы читаются из базы через .iterator() частями по
+    EXPORT_CHUNK_SIZE, поэтому память не растёт с их числом. Авторы, а
+    при with_comments и комментарии с их авторами, загружаются одним
+    запросом на часть. Строки в том же формате, что и в API; у отзыва
+    с комментариями добавлено поле comments.
+    """
+    renderer = FastJSONRenderer()
+    reviews = title.reviews.order_by('id').iterator(
+        chunk_size=settings.EXPORT_CHUNK_SIZE
+    )
+    for chunk in chunked(reviews, settings.EXPORT_CHUNK_SIZE):
+        comments = defaultdict(list)
+        if with_comments:
+            for comment in Comment.objects.filter(
+                review__in=chunk
+            ).order_by('review_id', 'id'):
+                comments[comment.review_id].append(comment)
+        items = [*chunk, *chain.from_iterable(comments.values())]
+        authors = User.objects.only('username').in_bulk(
+            {item.author_id for item in items}
+        )
+        for item in items:
+            item.author = authors[item.author_id]
+        lines = []
+        for review, data in zip(chunk, ReviewSerializer(
+            chunk, many=True, context=context
+        ).data):
+            if with_comments:
+                data['comments'] = CommentSerializer(
+                    comments[review.id], many=True, context=context
+                ).data
+            lines.append(renderer.render(data))
+        yield b'\n'.join(lines) + b'\n'
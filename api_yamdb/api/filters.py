@@ -1,5 +1,6 @@
 from django_filters import rest_framework as filters
 from reviews.models import Title
+from reviews.search import get_search_backend
 
 
 class TitlesFilter(filters.FilterSet):
@@ -7,10 +8,15 @@ class TitlesFilter(filters.FilterSet):
     genre = filters.CharFilter(field_name="genre__slug")
     name = filters.CharFilter(field_name="name")
     year = filters.NumberFilter(field_name="year")
+    q = filters.CharFilter(method='search')
 
     class Meta:
         model = Title
         fields = ['category',
                   'genre',
                   'name',
-                  'year']
+                  'year',
+                  'q']
+
+    def search(self, queryset, name, value):
+        return get_search_backend().filter(queryset, value)
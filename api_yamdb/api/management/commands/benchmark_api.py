@@ -0,0 +1,214 @@
+import json
+import statistics
+import time
+from io import StringIO
+from pathlib import Path
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test.utils import (CaptureQueriesContext, setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+# Замеры с параметрами по умолчанию. Число запросов сравнивается строго,
+# а задержки зависят от машины: baseline для CI пишется на той же машине.
+BASELINE = (
+    Path(__file__).resolve().parents[4] / 'benchmarks' / 'api_baseline.json'
+)
+# Маршрут: (имя, URL). Идентификаторы подставляются после наполнения базы.
+ROUTES = (
+    ('titles-list', '/api/v1/titles/'),
+    ('titles-list-100', '/api/v1/titles/?limit=100'),
+    ('titles-filtered', '/api/v1/titles/?genre=genre-0&category=category-0'),
+    ('titles-detail', '/api/v1/titles/{title}/'),
+    ('titles-stats', '/api/v1/titles/{title}/stats/'),
+    ('titles-batch', '/api/v1/titles/batch/?ids={batch_ids}'),
+    ('reviews-list', '/api/v1/titles/{title}/reviews/'),
+    ('reviews-deep-offset',
+     '/api/v1/titles/{title}/reviews/?offset={deep_offset}'),
+    ('reviews-cursor', '/api/v1/titles/{title}/reviews/?pagination=cursor'),
+    ('reviews-detail', '/api/v1/titles/{title}/reviews/{review}/'),
+    ('comments-list', '/api/v1/titles/{title}/reviews/{review}/comments/'),
+    ('comments-detail',
+     '/api/v1/titles/{title}/reviews/{review}/comments/{comment}/'),
+    ('categories-list', '/api/v1/categories/'),
+    ('genres-list', '/api/v1/genres/?search=genre'),
+    ('search', '/api/v1/search/?q=review'),
+    ('users-list', '/api/v1/users/'),
+    ('users-me', '/api/v1/users/me/'),
+)
+
+
+def seed(titles, reviews, comments, batch_size=1000):
+    """Наполняет базу синтетическими данными заданного размера.
+
+    SQLite не возвращает id из bulk_create, поэтому созданные строки
+    перечитываются перед тем, как на них сослаться.
+    """
+    User.objects.bulk_create(
+        User(username=f'user-{number}', email=f'user-{number}@yamdb.fake')
+        for number in range(max(reviews, comments))
+    )
+    users = list(User.objects.order_by('id'))
+    Category.objects.bulk_create(
+        Category(name=f'Category {number}', slug=f'category-{number}')
+        for number in range(3)
+    )
+    categories = list(Category.objects.order_by('id'))
+    Genre.objects.bulk_create(
+        Genre(name=f'Genre {number}', slug=f'genre-{number}')
+        for number in range(5)
+    )
+    genres = list(Genre.objects.order_by('id'))
+    Title.objects.bulk_create(
+        (Title(name=f'Title {number}', year=2000 + number % 20,
+               description=f'Description {number}',
+               category=categories[number % len(categories)])
+         for number in range(titles)),
+        batch_size=batch_size,
+    )
+    title_ids = list(Title.objects.order_by('id').values_list('id', flat=True))
+    Title.genre.through.objects.bulk_create(
+        (Title.genre.through(title_id=title_id, genre=genre)
+         for number, title_id in enumerate(title_ids)
+         for genre in genres[:number % 3 + 1]),
+        batch_size=batch_size,
+    )
+    Review.objects.bulk_create(
+        (Review(title_id=title_id, author=users[number],
+                text=f'review {number} of title {title_id}',
+                score=number % 10 + 1)
+         for title_id in title_ids for number in range(reviews)),
+        batch_size=batch_size,
+    )
+    review_ids = list(Review.objects.values_list('id', flat=True))
+    Comment.objects.bulk_create(
+        (Comment(review_id=review_id, author=users[number],
+                 text=f'comment {number} on review {review_id}')
+         for review_id in review_ids for number in range(comments)),
+        batch_size=batch_size,
+    )
+    call_command('recalculate_ratings', stdout=StringIO())
+
+
+def percentile(samples, percent):
+    return statistics.quantiles(samples, n=100, method='inclusive')[
+        percent - 1
+    ]
+
+
+class Command(BaseCommand):
+    help = "Measures latency, queries and response size of API routes"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=50,
+                            help='Reviews per title')
+        parser.add_argument('--comments', type=int, default=5,
+                            help='Comments per review')
+        parser.add_argument('--iterations', type=int, default=30)
+        parser.add_argument('--output', type=Path,
+                            help='Write results to this JSON file')
+        parser.add_argument('--baseline', type=Path,
+                            help='Compare results with this JSON file')
+        parser.add_argument('--tolerance', type=float, default=25,
+                            help='Allowed p95 latency growth, percent')
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            seed(options['titles'], options['reviews'], options['comments'])
+            results = self.run_routes(options['iterations'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.report(results, options)
+
+    def report(self, results, options):
+        self.print_results(results)
+        if options['output']:
+            options['output'].write_text(json.dumps(results, indent=2))
+        if options['baseline']:
+            self.compare(results, json.loads(options['baseline'].read_text()),
+                         options['tolerance'])
+
+    def run_routes(self, iterations):
+        admin = User.objects.create_user(
+            username='benchmark-admin', email='benchmark@yamdb.fake',
+            role=User.ADMIN,
+        )
+        client = APIClient()
+        client.credentials(
+            HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(admin)}'
+        )
+        review = Review.objects.order_by('id').first()
+        ids = {
+            'title': review.title_id,
+            'review': review.id,
+            'comment': review.comments.order_by('id').first().id,
+            'deep_offset': max(review.title.reviews.count() - 10, 0),
+            'batch_ids': ','.join(
+                str(pk) for pk in Title.objects.values_list('id', flat=True)[
+                    :settings.TITLES_BATCH_MAX_IDS
+                ]
+            ),
+        }
+        cache.clear()
+        results = {}
+        for name, url in ROUTES:
+            url = url.format(**ids)
+            client.get(url)
+            latencies = []
+            for _ in range(iterations):
+                with CaptureQueriesContext(connection) as context:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    latencies.append((time.perf_counter() - started) * 1000)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+            results[name] = {
+                'url': url,
+                'p50_ms': round(percentile(latencies, 50), 3),
+                'p95_ms': round(percentile(latencies, 95), 3),
+                'queries': len(context.captured_queries),
+                'bytes': len(response.content),
+            }
+        return results
+
+    def print_results(self, results):
+        self.stdout.write(
+            f'{"route":<22}{"p50 ms":>10}{"p95 ms":>10}'
+            f'{"queries":>9}{"bytes":>10}'
+        )
+        for name, row in results.items():
+            self.stdout.write(
+                f'{name:<22}{row["p50_ms"]:>10.2f}{row["p95_ms"]:>10.2f}'
+                f'{row["queries"]:>9}{row["bytes"]:>10}'
+            )
+
+    def compare(self, results, baseline, tolerance):
+        regressions = []
+        for name, row in results.items():
+            before = baseline.get(name)
+            if before is None:
+                continue
+            if row['queries'] > before['queries']:
+                regressions.append(
+                    f'{name}: queries {before["queries"]} -> {row["queries"]}'
+                )
+            if row['p95_ms'] > before['p95_ms'] * (1 + tolerance / 100):
+                regressions.append(
+                    f'{name}: p95 {before["p95_ms"]}ms -> {row["p95_ms"]}ms'
+                )
+        if regressions:
+            raise CommandError(
+                'Performance regressions:\n' + '\n'.join(regressions)
+            )
+        self.stdout.write('No regressions against baseline')
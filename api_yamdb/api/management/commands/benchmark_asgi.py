@@ -0,0 +1,175 @@
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import time
+from argparse import SUPPRESS
+from collections import Counter
+from functools import partial
+from tempfile import TemporaryDirectory
+
+from api.async_reads import StreamingASGIHandler
+from api.management.commands.benchmark_api import seed
+from django.conf import settings
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db.backends.signals import connection_created
+from reviews.models import Review
+
+MODES = ('sync', 'async')
+
+
+def add_latency(sender, connection, seconds, **kwargs):
+    def wait(execute, sql, params, many, context):
+        time.sleep(seconds)
+        return execute(sql, params, many, context)
+
+    connection.execute_wrappers.append(wait)
+
+
+async def asgi_get(application, url):
+    """Один GET через ASGI-приложение, как его отправил бы uvicorn."""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(),
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    status = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+async def run_load(application, urls, total, concurrency):
+    """total запросов, из которых одновременно выполняются concurrency."""
+    statuses = Counter()
+    numbers = iter(range(total))
+
+    async def client():
+        for number in numbers:
+            url = urls[number % len(urls)]
+            statuses[await asgi_get(application, url)] += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - started, statuses
+
+
+class Command(BaseCommand):
+    help = "Compares ASGI throughput of the sync and async read paths"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=200)
+        parser.add_argument('--reviews', type=int, default=20,
+                            help='Reviews per title')
+        parser.add_argument('--comments', type=int, default=2,
+                            help='Comments per review')
+        parser.add_argument('--requests', type=int, default=2000)
+        parser.add_argument('--concurrency', type=int, default=32)
+        parser.add_argument(
+            '--db-latency', type=float, default=0,
+            help='Milliseconds added to every query to model a networked '
+                 'database; in-process SQLite has no I/O wait to overlap',
+        )
+        # Служебные режимы дочерних процессов.
+        parser.add_argument('--prepare', action='store_true', help=SUPPRESS)
+        parser.add_argument('--serve', choices=MODES, help=SUPPRESS)
+
+    def handle(self, *args, **options):
+        if options['prepare']:
+            call_command('migrate', verbosity=0)
+            seed(options['titles'], options['reviews'], options['comments'])
+            return
+        if options['serve']:
+            return self.serve(options)
+        results = {}
+        with TemporaryDirectory() as directory:
+            env = {
+                **os.environ,
+                'DATABASE_URL': f'sqlite:///{directory}/benchmark.sqlite3',
+            }
+            self.run_child(env, options, '--prepare')
+            for mode in MODES:
+                env['DJANGO_ASYNC_READS'] = str(mode == 'async')
+                output = self.run_child(env, options, '--serve', mode)
+                results[mode] = json.loads(output.splitlines()[-1])
+        self.print_results(results, options)
+
+    def run_child(self, env, options, *mode):
+        # Режим чтения выбирается при загрузке URL, поэтому каждый
+        # режим измеряется в отдельном процессе на одной и той же базе.
+        command = [
+            sys.executable, str(settings.BASE_DIR / 'manage.py'),
+            'benchmark_asgi', *mode,
+            '--titles', str(options['titles']),
+            '--reviews', str(options['reviews']),
+            '--comments', str(options['comments']),
+            '--requests', str(options['requests']),
+            '--concurrency', str(options['concurrency']),
+            '--db-latency', str(options['db_latency']),
+        ]
+        result = subprocess.run(
+            command, env=env, capture_output=True, text=True
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return result.stdout
+
+    def serve(self, options):
+        review = Review.objects.order_by('id').first()
+        prefix = f'/api/v1/titles/{review.title_id}/reviews/'
+        urls = (
+            '/api/v1/titles/',
+            f'/api/v1/titles/{review.title_id}/',
+            prefix,
+            f'{prefix}{review.id}/',
+            f'{prefix}{review.id}/comments/',
+        )
+        if options['db_latency']:
+            connection_created.connect(
+                partial(add_latency, seconds=options['db_latency'] / 1000),
+                weak=False,
+            )
+        application = StreamingASGIHandler()
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(run_load(
+                application, urls, len(urls) * 2, options['concurrency']
+            ))
+            elapsed, statuses = loop.run_until_complete(run_load(
+                application, urls, options['requests'],
+                options['concurrency'],
+            ))
+        finally:
+            loop.close()
+        if set(statuses) != {200}:
+            raise CommandError(f'Unexpected statuses: {dict(statuses)}')
+        self.stdout.write(json.dumps({
+            'requests': options['requests'],
+            'seconds': round(elapsed, 3),
+            'rps': round(options['requests'] / elapsed, 1),
+        }))
+
+    def print_results(self, results, options):
+        self.stdout.write(
+            f'{options["requests"]} GET requests, '
+            f'{options["concurrency"]} concurrent, '
+            f'+{options["db_latency"]}ms per query'
+        )
+        for mode, row in results.items():
+            self.stdout.write(
+                f'{mode:<6}{row["rps"]:>10.1f} req/s{row["seconds"]:>9.2f}s'
+            )
+        self.stdout.write(
+            f'speedup x{results["async"]["rps"] / results["sync"]["rps"]:.2f}'
+        )
@@ -0,0 +1,90 @@
+import timeit
+from io import BytesIO
+
+from api.management.commands.benchmark_api import seed
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer, orjson
+from django.core.management import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (setup_test_environment,
+                               teardown_test_environment)
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+from reviews.models import Review
+
+# Страницы, данные которых сравниваются: (имя, URL).
+PAGES = (
+    ('titles-100', '/api/v1/titles/?limit=100'),
+    ('reviews-100', '/api/v1/titles/{title}/reviews/?limit=100'),
+)
+
+
+def measure(function, number):
+    """Лучшее из пяти время одного вызова, мкс."""
+    return min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6
+
+
+class Command(BaseCommand):
+    help = "Compares the stdlib and fast JSON renderer/parser on API pages"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=100)
+        parser.add_argument('--reviews', type=int, default=100,
+                            help='Reviews per title')
+        parser.add_argument('--number', type=int, default=200,
+                            help='Calls per timing run')
+
+    def handle(self, *args, **options):
+        if orjson is None:
+            self.stdout.write('orjson is not installed, fast classes fall '
+                              'back to the stdlib implementation')
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            seed(options['titles'], options['reviews'], comments=0)
+            pages = self.load_pages()
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+        self.stdout.write(
+            f'{"page":<14}{"bytes":>8}{"op":>7}{"stdlib us":>12}'
+            f'{"fast us":>10}{"speedup":>9}'
+        )
+        for name, data in pages.items():
+            self.compare(name, data, options['number'])
+
+    def load_pages(self):
+        review = Review.objects.order_by('id').first()
+        client = APIClient()
+        pages = {}
+        for name, url in PAGES:
+            url = url.format(title=review.title_id)
+            response = client.get(url)
+            if response.status_code != 200:
+                raise CommandError(f'{url} returned {response.status_code}')
+            pages[name] = response.data
+        return pages
+
+    def compare(self, name, data, number):
+        content = JSONRenderer().render(data)
+        if FastJSONRenderer().render(data) != content:
+            raise CommandError(f'{name}: rendered bytes differ')
+        if FastJSONParser().parse(BytesIO(content)) != (
+            JSONParser().parse(BytesIO(content))
+        ):
+            raise CommandError(f'{name}: parsed data differs')
+        operations = (
+            ('render', lambda renderer: lambda: renderer.render(data),
+             JSONRenderer(), FastJSONRenderer()),
+            ('parse', lambda parser: lambda: parser.parse(BytesIO(content)),
+             JSONParser(), FastJSONParser()),
+        )
+        for operation, call, stdlib, fast in operations:
+            before = measure(call(stdlib), number)
+            after = measure(call(fast), number)
+            self.stdout.write(
+                f'{name:<14}{len(content):>8}{operation:>7}{before:>12.1f}'
+                f'{after:>10.1f}{before / after:>8.2f}x'
+            )
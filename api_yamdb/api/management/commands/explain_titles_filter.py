@@ -0,0 +1,112 @@
+from io import StringIO
+from itertools import combinations
+
+from api.filters import TitlesFilter
+from api.views import TitleViewSet
+from django.core.management import BaseCommand, CommandError, call_command
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+from reviews.models import Title
+
+FILTERS = ('category', 'genre', 'name', 'year')
+PAGE_SIZE = 10
+# Признаки полного прохода по таблице в планах SQLite и PostgreSQL.
+FULL_SCAN_MARKERS = ('Seq Scan',)
+
+
+def filter_values():
+    """Значения фильтров, для которых в базе есть хотя бы одна строка."""
+    title = Title.objects.filter(
+        category__isnull=False, genre__isnull=False
+    ).select_related('category').prefetch_related('genre').first()
+    if title is None:
+        raise CommandError('No titles with category and genre to explain')
+    return {
+        'category': title.category.slug,
+        'genre': title.genre.all()[0].slug,
+        'name': title.name,
+        'year': str(title.year),
+    }
+
+
+def in_memory_sorts(plan):
+    return [line for line in plan.splitlines()
+            if 'TEMP B-TREE FOR ORDER BY' in line or 'Sort Key' in line]
+
+
+def full_scans(plan):
+    """Строки плана, в которых таблица читается целиком."""
+    scans = []
+    for line in plan.splitlines():
+        step = line.strip(' |-`')
+        if step.startswith('SCAN ') and ' USING ' not in step:
+            scans.append(step)
+        elif any(marker in step for marker in FULL_SCAN_MARKERS):
+            scans.append(step)
+    return scans
+
+
+class Command(BaseCommand):
+    help = "Prints EXPLAIN for every TitlesFilter combination"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--current-db', action='store_true',
+            help='Explain against the configured database instead of '
+                 'a generated test database',
+        )
+        parser.add_argument('--titles', type=int, default=2000)
+        parser.add_argument('--users', type=int, default=200)
+        parser.add_argument('--max-reviews', type=int, default=50)
+        parser.add_argument(
+            '--strict', action='store_true',
+            help='Fail if any combination reads a table in full',
+        )
+
+    def handle(self, *args, **options):
+        if options['current_db']:
+            return self.explain_all(options['strict'])
+        setup_test_environment()
+        old_name = connection.creation.create_test_db(verbosity=0)
+        try:
+            call_command(
+                'generate_dataset', titles=options['titles'],
+                users=options['users'], max_reviews=options['max_reviews'],
+                comments_mean=0, stdout=StringIO(),
+            )
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+            self.explain_all(options['strict'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+            teardown_test_environment()
+
+    def explain_all(self, strict):
+        values = filter_values()
+        problems, sorts = [], []
+        for size in range(len(FILTERS) + 1):
+            for names in combinations(FILTERS, size):
+                params = {name: values[name] for name in names}
+                queryset = TitlesFilter(
+                    params, queryset=TitleViewSet.queryset.all()
+                ).qs[:PAGE_SIZE]
+                plan = queryset.explain()
+                label = ', '.join(names) or 'no filters'
+                self.stdout.write(f'== {label}')
+                self.stdout.write(plan)
+                problems.extend(
+                    f'{label}: {scan}' for scan in full_scans(plan)
+                )
+                if in_memory_sorts(plan):
+                    sorts.append(label)
+        if sorts:
+            # Фильтр по жанру идёт через GenreTitle, поэтому страница
+            # сортируется по найденным строкам, а не читается по индексу.
+            self.stdout.write('Sorted in memory: ' + '; '.join(sorts))
+        if problems:
+            message = 'Full table scans:\n' + '\n'.join(problems)
+            if strict:
+                raise CommandError(message)
+            self.stdout.write(message)
+        else:
+            self.stdout.write('Every combination is index-backed')
@@ -1,8 +1,150 @@
-from rest_framework import mixins, viewsets
+import hashlib
 
+from api.bulk import BulkWriteMixin
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import Http404
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import mixins, status, viewsets
+from rest_framework.renderers import BrowsableAPIRenderer
+from rest_framework.response import Response
+from reviews.models import Title
 
-class CreateListDestroyViewSet(mixins.CreateModelMixin,
+
+def weak_etag(*parts):
+    raw = ':'.join(str(part) for part in parts)
+    return 'W/' + quote_etag(hashlib.md5(raw.encode()).hexdigest())
+
+
+def strip_weak(etag):
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def list_marker(queryset):
+    """Метка версии списка: последнее изменение и число строк."""
+    return tuple(queryset.aggregate(
+        updated=Max('updated_at'), count=Count('pk')
+    ).values())
+
+
+class CachedListMixin:
+    """Кеширует ответ list под ETag, построенным из состояния базы.
+
+    Версия списка — list_marker отфильтрованного queryset: одно
+    агрегирование вместо выборки строк. Поэтому изменения из любого
+    воркера, админки или shell сразу дают новый ETag, а страница
+    под старым ETag просто перестаёт запрашиваться и истекает через
+    LIST_CACHE_TIMEOUT. Условные запросы получают 304 без выборки и
+    сериализации. Last-Modified не отправляется: удаление строк не
+    сдвигает Max(updated_at), и If-Modified-Since получал бы 304 на
+    изменившийся список, а ETag учитывает и число строк. Сжатое тело
+    ответа кеширует CompressionMiddleware.
+    """
+
+    def list(self, request, *args, **kwargs):
+        updated, count = list_marker(
+            self.filter_queryset(self.get_queryset())
+        )
+        etag = weak_etag(request.build_absolute_uri(), updated, count)
+        not_modified = get_conditional_response(request, etag=etag)
+        if not_modified is not None:
+            return not_modified
+        key = f'list:{etag}'
+        data = cache.get(key)
+        if data is None:
+            data = super().list(request, *args, **kwargs).data
+            cache.set(key, data, settings.LIST_CACHE_TIMEOUT)
+        response = Response(data, headers={'ETag': etag})
+        # Тело JSON однозначно задаётся ETag и форматом, поэтому сжатые
+        # байты кешируются рядом с данными списка. HTML browsable API
+        # содержит пользователя и CSRF-токен и так не кешируется.
+        if not isinstance(request.accepted_renderer, BrowsableAPIRenderer):
+            response.compressed_cache_key = (
+                f'{key}:{request.accepted_renderer.format}'
+            )
+        return response
+
+
+class ConditionalMixin:
+    """Условные запросы по слабым ETag для list, retrieve и изменений.
+
+    ETag строится из дешёвой метки версии, а не из ответа: для объекта
+    это updated_at, для списка — list_marker. Метка берётся только из
+    базы: изменения связанных объектов, видимые в ответе, обновляют
+    updated_at через reviews.signals. Отдельный запрос метки выполняется
+    только при If-None-Match, и на совпадение 304 отдаётся до загрузки
+    объектов и сериализации. Без условного заголовка метка берётся из
+    уже загруженных данных. If-Match на PUT
+    и PATCH сравнивается слабо: ETag здесь — метка версии, а не хеш
+    байтов ответа.
+    """
+    def get_list_marker(self):
+        return list_marker(self.filter_queryset(self.get_queryset()))
+
+    def get_object_marker(self):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        try:
+            marker = self.get_queryset().filter(**{
+                self.lookup_field: self.kwargs[lookup_url_kwarg]
+            }).values_list('updated_at', flat=True).first()
+        except (TypeError, ValueError):
+            marker = None
+        if marker is None:
+            raise Http404
+        return marker
+
+    def get_etag(self, marker):
+        return weak_etag(self.request.get_full_path(), marker)
+
+    def not_modified(self, request, get_marker):
+        if 'HTTP_IF_NONE_MATCH' not in request.META:
+            return None
+        return get_conditional_response(
+            request, etag=self.get_etag(get_marker())
+        )
+
+    def list(self, request, *args, **kwargs):
+        response = self.not_modified(request, self.get_list_marker)
+        if response is None:
+            response = super().list(request, *args, **kwargs)
+            response['ETag'] = self.get_etag(self.get_list_marker())
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        response = self.not_modified(request, self.get_object_marker)
+        if response is None:
+            instance = self.get_object()
+            response = Response(self.get_serializer(instance).data)
+            response['ETag'] = self.get_etag(instance.updated_at)
+        return response
+
+    def update(self, request, *args, **kwargs):
+        if_match = parse_etags(request.META.get('HTTP_IF_MATCH', ''))
+        if if_match and if_match != ['*']:
+            etag = self.get_etag(self.get_object_marker())
+            if not any(strip_weak(tag) == strip_weak(etag)
+                       for tag in if_match):
+                return Response(status=status.HTTP_412_PRECONDITION_FAILED)
+        response = super().update(request, *args, **kwargs)
+        response['ETag'] = self.get_etag(self.get_object_marker())
+        return response
+
+
+class CreateListDestroyViewSet(CachedListMixin,
+                               BulkWriteMixin,
+                               mixins.CreateModelMixin,
                                mixins.ListModelMixin,
                                mixins.DestroyModelMixin,
                                viewsets.GenericViewSet):
-    pass
+    # Фильтр произведений по списку изменённых объектов, например
+    # 'category__in': их updated_at обновляется после пакетного PATCH.
+    touch_titles_filter = None
+
+    def perform_bulk_update(self, changes):
+        objects = super().perform_bulk_update(changes)
+        # bulk_update не отправляет post_save, см. reviews.signals.
+        if self.touch_titles_filter is not None:
+            Title.touch(**{self.touch_titles_filter: objects})
+        return objects
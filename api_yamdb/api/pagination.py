@@ -0,0 +1,103 @@
+from api.mixins import list_marker
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, LimitOffsetPagination
+
+
+class PubDateCursorPagination(CursorPagination):
+    """Курсорная пагинация по ключу (pub_date, id).
+
+    DRF ставит курсор только по первому полю сортировки, а строки с тем же
+    pub_date добирает смещением, которое обрезается на offset_cutoff.
+    После массовой загрузки у тысяч строк один pub_date, и часть из них
+    пропускалась бы или повторялась. Поэтому позиция здесь — пара
+    pub_date и id, а страница выбирается по ключу целиком.
+    """
+    ordering = ('-pub_date', '-id')
+    page_size_query_param = 'limit'
+    max_page_size = 100
+
+    @staticmethod
+    def encode_position(pub_date, pk):
+        return f'{pub_date.isoformat()}|{pk}'
+
+    def _get_position_from_instance(self, instance, ordering):
+        return self.encode_position(instance.pub_date, instance.pk)
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        self.key = None
+        if cursor is None or cursor.position is None:
+            return cursor
+        pub_date, _, pk = cursor.position.partition('|')
+        pub_date = parse_datetime(pub_date)
+        if pub_date is None or not pk.isdigit():
+            raise NotFound(self.invalid_cursor_message)
+        self.key = (pub_date, int(pk))
+        # Фильтр DRF по одному pub_date не нужен: страницу отбирает
+        # paginate_queryset по паре.
+        return cursor._replace(position=None)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        cursor = self.decode_cursor(request)
+        if self.key:
+            pub_date, pk = self.key
+            lookup = 'gt' if cursor.reverse else 'lt'
+            queryset = queryset.filter(
+                Q(**{f'pub_date__{lookup}': pub_date})
+                | Q(pub_date=pub_date, **{f'id__{lookup}': pk})
+            )
+        page = super().paginate_queryset(queryset, request, view)
+        if self.key:
+            position = self.encode_position(*self.key)
+            if cursor.reverse:
+                self.has_next, self.next_position = True, position
+            else:
+                self.has_previous, self.previous_position = True, position
+            self.display_page_controls = self.template is not None
+        return page
+
+
+class LimitOffsetOrCursorPagination(LimitOffsetPagination):
+    """Limit/offset по умолчанию, курсор по запросу клиента.
+
+    Курсорный режим включается параметром `?pagination=cursor`;
+    ссылки `next`/`previous` в этом режиме содержат параметр `cursor`.
+    """
+    mode_query_param = 'pagination'
+    cursor_mode = 'cursor'
+    cursor_pagination_class = PubDateCursorPagination
+
+    def use_cursor(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == self.cursor_mode
+            or self.cursor_pagination_class.cursor_query_param
+            in request.query_params
+        )
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        if self.use_cursor(request):
+            self.cursor_paginator = self.cursor_pagination_class()
+            return self.cursor_paginator.paginate_queryset(
+                queryset, request, view
+            )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+
+class VersionedLimitOffsetPagination(LimitOffsetPagination):
+    """Limit/offset, который вместе с COUNT считает метку версии списка.
+
+    ConditionalMixin берёт метку отсюда и не делает для ETag отдельный
+    запрос.
+    """
+
+    def get_count(self, queryset):
+        self.marker = list_marker(queryset)
+        return self.marker[1]
@@ -0,0 +1,39 @@
+import codecs
+import re
+from io import BytesIO
+
+from api.renderers import FastJSONRenderer, orjson
+from django.conf import settings
+from rest_framework.parsers import JSONParser
+
+# Целые вне 64 бит orjson молча читает как float. Такие числа длиннее
+# 18 цифр; совпадение внутри строки лишь отправит тело в JSONParser.
+LONG_NUMBER = re.compile(rb'\d{19}')
+
+
+class FastJSONParser(JSONParser):
+    """JSONParser на orjson, если он установлен.
+
+    Всё, что orjson отвергает — NaN без STRICT_JSON, одиночные
+    суррогаты, синтаксические ошибки, — разбирается JSONParser, поэтому
+    допустимые данные и тексты ошибок те же. Тела с числами от 19 цифр
+    тоже разбирает JSONParser: он сохраняет большие целые как int.
+    """
+    renderer_class = FastJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        if orjson is None:
+            return super().parse(stream, media_type, parser_context)
+        encoding = (parser_context or {}).get(
+            'encoding', settings.DEFAULT_CHARSET
+        )
+        raw = stream.read()
+        try:
+            content = raw
+            if codecs.lookup(encoding).name != 'utf-8':
+                content = raw.decode(encoding).encode()
+            if not LONG_NUMBER.search(content):
+                return orjson.loads(content)
+        except (orjson.JSONDecodeError, UnicodeError):
+            pass
+        return super().parse(BytesIO(raw), media_type, parser_context)
@@ -0,0 +1,49 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson:
+    # Дата и время отдаются в default, чтобы формат совпадал с DRF:
+    # isoformat() и «Z» вместо «+00:00». Dataclass orjson сериализует
+    # сам, а JSONRenderer — нет.
+    ORJSON_OPTIONS = (
+        orjson.OPT_PASSTHROUGH_DATETIME
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_NON_STR_KEYS
+    )
+
+
+class FastJSONRenderer(JSONRenderer):
+    """JSONRenderer на orjson, если он установлен.
+
+    Вывод побайтно совпадает с JSONRenderer при настройках DRF по
+    умолчанию: компактные разделители, UTF-8 без экранирования и
+    экранированные U+2028 и U+2029. Типы, которых нет в JSON, включая
+    datetime и Decimal, преобразует тот же JSONEncoder.default.
+    Отличаются только float вне [1e-4, 1e16) — 1e16 вместо 1e+16 — и
+    NaN, который orjson пишет как null; API таких чисел не отдаёт.
+    Отступы для Browsable API, прочие настройки и данные, которые
+    orjson не умеет (целые больше 64 бит), обрабатывает JSONRenderer.
+    """
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None
+            or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {})
+            is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            content = orjson.dumps(
+                data, default=self.encoder_class().default,
+                option=ORJSON_OPTIONS,
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        return content.replace(
+            b'\xe2\x80\xa8', b'\\u2028'
+        ).replace(b'\xe2\x80\xa9', b'\\u2029')
@@ -0,0 +1,108 @@
+import asyncio
+import random
+from contextvars import ContextVar
+from hashlib import md5
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.checks import Warning
+from django.db import DEFAULT_DB_ALIAS
+from rest_framework.permissions import SAFE_METHODS
+
+# Включается на время безопасного запроса, который можно читать с реплики.
+replica_reads = ContextVar('replica_reads', default=False)
+
+
+def primary_pin_key(request):
+    """Ключ клиента: по токену, а без него — по адресу."""
+    client = (request.META.get('HTTP_AUTHORIZATION')
+              or request.META.get('REMOTE_ADDR', ''))
+    return f'db-primary:{md5(client.encode()).hexdigest()}'
+
+
+def check_replica_cache(app_configs, **kwargs):
+    """С репликами отметки о записи нужны всем воркерам сразу."""
+    if settings.DATABASE_REPLICAS and isinstance(
+        caches['default'], (LocMemCache, DummyCache)
+    ):
+        return [Warning(
+            'DB_REPLICAS is set but the default cache is not shared '
+            'between processes, so clients may read stale data from a '
+            'replica right after a write.',
+            hint='Point CACHE_URL at a shared cache such as memcached://, '
+                 'db:// or file://.',
+            id='api.W001',
+        )]
+    return []
+
+
+class ReplicaRouter:
+    """Чтение с реплик внутри безопасных запросов, остальное — с primary.
+
+    Миграции выполняются только на primary: реплики получают схему
+    вместе с данными через репликацию.
+    """
+
+    def db_for_read(self, model, **hints):
+        if settings.DATABASE_REPLICAS and replica_reads.get():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        pool = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        return {obj1._state.db, obj2._state.db} <= pool
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+class ReplicaMiddleware:
+    """Отправляет GET, HEAD и OPTIONS на реплики.
+
+    После успешной записи клиент на REPLICA_STICKINESS секунд читает
+    с primary, чтобы видеть свои изменения раньше, чем их догонит
+    реплика. Отметки хранятся в кеше по умолчанию: с несколькими
+    воркерами он должен быть общим (CACHE_URL), иначе запись, принятая
+    одним воркером, не закрепит клиента за primary в остальных.
+    Работает и под ASGI без перехода в синхронный поток.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self):
+            return self.__acall__(request)
+        key, token = self.start(request)
+        try:
+            response = self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.finish(request, key, response)
+
+    async def __acall__(self, request):
+        key, token = self.start(request)
+        try:
+            response = await self.get_response(request)
+        finally:
+            replica_reads.reset(token)
+        return self.finish(request, key, response)
+
+    def start(self, request):
+        key = primary_pin_key(request)
+        safe = request.method in SAFE_METHODS
+        return key, replica_reads.set(safe and not cache.get(key))
+
+    def finish(self, request, key, response):
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            cache.set(key, True, settings.REPLICA_STICKINESS)
+        return response
@@ -3,6 +3,23 @@ from rest_framework.serializers import ValidationError
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import User
 
+REVIEW_EXISTS_ERROR = 'Нельзя оставлять больше одного отзыва на произведение!'
+
+
+class PrefetchedSlugRelatedField(serializers.SlugRelatedField):
+    """SlugRelatedField, который при пакетной записи берёт объекты из
+    context['related_objects'] вместо запроса на каждое значение."""
+
+    def to_internal_value(self, data):
+        related = self.context.get('related_objects')
+        if related is None:
+            return super().to_internal_value(data)
+        objects = related[self.get_queryset().model]
+        if not isinstance(data, str) or data not in objects:
+            self.fail('does_not_exist', slug_name=self.slug_field,
+                      value=data)
+        return objects[data]
+
 
 class SignUpSerializer(serializers.ModelSerializer):
     class Meta:
@@ -54,15 +71,10 @@ class ReviewSerializer(serializers.ModelSerializer):
         model = Review
         read_only_fields = ('title',)
 
-    def validate(self, data):
-        request = self.context['request']
-        title_id = self.context['view'].kwargs['title_id']
-        if request.method == 'POST' and Review.objects.filter(
-                title=title_id, author=request.user).exists():
-            raise serializers.ValidationError(
-                'Нельзя оставлять больше одного отзыва на произведение!'
-            )
-        return data
+
+class ReviewSearchSerializer(ReviewSerializer):
+    class Meta(ReviewSerializer.Meta):
+        fields = ReviewSerializer.Meta.fields + ('title',)
 
 
 class CommentSerializer(serializers.ModelSerializer):
@@ -95,22 +107,37 @@ class TitleReadSerializer(serializers.ModelSerializer):
     rating = serializers.IntegerField(read_only=True)
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'rating', 'description', 'genre',
+                  'category')
         model = Title
         read_only_fields = ('rating',)
 
 
+class TitleStatsSerializer(serializers.ModelSerializer):
+    count = serializers.IntegerField(source='rating_count')
+    average = serializers.FloatField(source='rating')
+    histogram = serializers.SerializerMethodField()
+
+    class Meta:
+        fields = ('count', 'average', 'histogram')
+        model = Title
+
+    def get_histogram(self, title):
+        counts = {row.score: row.count for row in title.score_counts.all()}
+        return {str(score): counts.get(score, 0) for score in range(1, 11)}
+
+
 class TitleWriteSerializer(serializers.ModelSerializer):
-    category = serializers.SlugRelatedField(
+    category = PrefetchedSlugRelatedField(
         queryset=Category.objects.all(),
         slug_field='slug'
     )
-    genre = serializers.SlugRelatedField(
+    genre = PrefetchedSlugRelatedField(
         queryset=Genre.objects.all(),
         slug_field='slug',
         many=True
     )
 
     class Meta:
-        fields = '__all__'
+        fields = ('id', 'name', 'year', 'description', 'genre', 'category')
         model = Title
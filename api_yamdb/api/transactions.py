@@ -0,0 +1,53 @@
+import random
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, OperationalError, transaction
+
+LOCK_ERRORS = ('database is locked', 'database table is locked')
+
+
+def is_lock_error(error):
+    return any(message in str(error) for message in LOCK_ERRORS)
+
+
+class ImmediateAtomic(transaction.Atomic):
+    """atomic(), который на SQLite начинает транзакцию с BEGIN IMMEDIATE.
+
+    Обычный BEGIN берёт блокировку записи только на первом изменении.
+    Если до него транзакция успела прочитать данные, а другой писатель
+    закоммитил свои, SQLite сразу отвечает «database is locked», не
+    дожидаясь busy_timeout. IMMEDIATE берёт блокировку в самом начале,
+    поэтому ошибка возможна только там. Начало повторяется до
+    DB_LOCK_RETRIES раз с растущей случайной паузой, а тело транзакции
+    никогда не выполняется дважды.
+    """
+
+    def __enter__(self):
+        connection = transaction.get_connection(self.using)
+        if connection.vendor != 'sqlite' or connection.in_atomic_block:
+            return super().__enter__()
+        connection.ensure_connection()
+        connection._start_transaction_under_autocommit = (
+            lambda: connection.cursor().execute('BEGIN IMMEDIATE')
+        )
+        try:
+            for attempt in range(settings.DB_LOCK_RETRIES + 1):
+                try:
+                    return super().__enter__()
+                except OperationalError as error:
+                    if (not is_lock_error(error)
+                            or attempt == settings.DB_LOCK_RETRIES):
+                        raise
+                time.sleep(random.uniform(
+                    0, settings.DB_LOCK_RETRY_DELAY * 2 ** attempt
+                ))
+        finally:
+            del connection._start_transaction_under_autocommit
+
+
+def immediate_atomic(using=None, savepoint=True):
+    """Как transaction.atomic: декоратор или контекстный менеджер."""
+    if callable(using):
+        return ImmediateAtomic(DEFAULT_DB_ALIAS, savepoint, False)(using)
+    return ImmediateAtomic(using, savepoint, False)
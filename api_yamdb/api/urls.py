@@ -1,6 +1,6 @@
 from api.views import (CategoryViewSet, CommentViewSet, CustomTokenObtainView,
-                       GenreViewSet, ReviewViewSet, SignUpView, TitleViewSet,
-                       UsersViewSet)
+                       GenreViewSet, ReviewViewSet, SearchView, SignUpView,
+                       TitleViewSet, UsersViewSet)
 from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 from rest_framework_simplejwt.views import TokenRefreshView
@@ -22,6 +22,7 @@ v1_router.register(r'users', UsersViewSet)
 
 urlpatterns = [
     path('v1/', include(v1_router.urls)),
+    path('v1/search/', SearchView.as_view(), name='search'),
     path('v1/auth/signup/', SignUpView.as_view(), name='signup'),
     path(
         'v1/auth/token/',
@@ -1,27 +1,41 @@
+from api.async_reads import AsyncReadMixin
+from api.authentication import invalidate_cached_user
+from api.bulk import BulkWriteMixin, insert_all
+from api.export import export_reviews
 from api.filters import TitlesFilter
-from api.mixins import CreateListDestroyViewSet
+from api.mixins import ConditionalMixin, CreateListDestroyViewSet
+from api.pagination import (LimitOffsetOrCursorPagination,
+                            VersionedLimitOffsetPagination)
 from api.permissions import (IsAdmin, IsAdminModeratorAuthorOrReadOnly,
                              IsAdminOrReadOnly)
-from api.serializers import (CategorySerializer, CommentSerializer,
-                             CustomTokenObtainSerializer, GenreSerializer,
+from api.serializers import (REVIEW_EXISTS_ERROR, CategorySerializer,
+                             CommentSerializer, CustomTokenObtainSerializer,
+                             GenreSerializer, ReviewSearchSerializer,
                              ReviewSerializer, SignUpSerializer,
-                             TitleReadSerializer, TitleWriteSerializer,
-                             UserEditSerializer, UserSerializer)
+                             TitleReadSerializer, TitleStatsSerializer,
+                             TitleWriteSerializer, UserEditSerializer,
+                             UserSerializer)
+from api.transactions import immediate_atomic
+from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, generics, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
 from rest_framework.filters import SearchFilter
 from rest_framework.permissions import (AllowAny, IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
+from rest_framework.settings import api_settings
 from rest_framework_simplejwt.tokens import RefreshToken
 from rest_framework_simplejwt.views import TokenObtainPairView
-from reviews.models import Category, Genre, Review, Title
+from reviews.models import Category, Comment, Genre, GenreTitle, Review, Title
+from reviews.search import get_search_backend
 from users.models import User
+from users.outbox import queue_mail
 
 
 class SignUpView(generics.GenericAPIView):
@@ -37,18 +51,14 @@ class SignUpView(generics.GenericAPIView):
             return Response(request.data, status=status.HTTP_200_OK)
         serializer = SignUpSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        serializer.save(is_active=False)
-        user = User.objects.get(username=serializer.data['username'])
-        confirmation_code = default_token_generator.make_token(user)
-        user.save()
-        email_subject = "Activate your Account"
-        email_body = f'Your confirmation code: {confirmation_code}'
-        send_mail(
-            email_subject,
-            email_body,
-            from_email=None,
-            recipient_list=[user.email],
-        )
+        with immediate_atomic():
+            serializer.save(is_active=False)
+            user = User.objects.get(username=serializer.data['username'])
+            confirmation_code = default_token_generator.make_token(user)
+            user.save()
+            email_subject = "Activate your Account"
+            email_body = f'Your confirmation code: {confirmation_code}'
+            queue_mail(email_subject, email_body, user.email)
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
@@ -73,36 +83,127 @@ class CustomTokenObtainView(TokenObtainPairView):
         )
 
 
-class ReviewViewSet(viewsets.ModelViewSet):
+class ReviewViewSet(AsyncReadMixin, ConditionalMixin, viewsets.ModelViewSet):
     serializer_class = ReviewSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = LimitOffsetOrCursorPagination
 
     def get_title(self):
-        return get_object_or_404(Title, id=self.kwargs['title_id'])
+        """Произведение из URL, загружается один раз за запрос."""
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(Title, id=self.kwargs['title_id'])
+        return self._title
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['title'] = self.get_title()
+        return context
 
+    def get_list_marker(self):
+        # Любое изменение отзывов обновляет updated_at произведения.
+        return self.get_title().updated_at
+
+    @immediate_atomic
     def perform_create(self, serializer):
-        serializer.save(author=self.request.user, title=self.get_title())
+        # Уникальность (author, title) проверяет база: без гонки между
+        # проверкой и вставкой и без лишнего запроса.
+        try:
+            with transaction.atomic():
+                review = serializer.save(
+                    author=self.request.user, title=self.get_title()
+                )
+        except IntegrityError:
+            raise ValidationError(
+                {api_settings.NON_FIELD_ERRORS_KEY: [REVIEW_EXISTS_ERROR]}
+            )
+        Title.apply_review_change(review.title_id, new_score=review.score)
+
+    @immediate_atomic
+    def perform_update(self, serializer):
+        old_score = serializer.instance.score
+        review = serializer.save()
+        Title.apply_review_change(review.title_id, old_score, review.score)
+
+    @immediate_atomic
+    def perform_destroy(self, instance):
+        # Оценку из рейтинга вычитает reviews.signals.remove_review_score.
+        instance.delete()
 
     def get_queryset(self):
+        return self.get_title().reviews.select_related('author')
+
+    @action(detail=False, url_path='export')
+    def export(self, request, title_id=None):
+        """Все отзывы произведения потоком NDJSON.
+
+        С `?comments=true` у каждого отзыва есть его комментарии.
+        """
         title = self.get_title()
-        return title.reviews.all()
+        with_comments = (
+            request.query_params.get('comments', '').lower() in ('1', 'true')
+        )
+        # Под ASGI ответ перебирает StreamingASGIHandler вне цикла событий.
+        response = StreamingHttpResponse(
+            export_reviews(
+                title, self.get_serializer_context(), with_comments
+            ),
+            content_type='application/x-ndjson',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="title-{title.pk}-reviews.ndjson"'
+        )
+        return response
 
 
-class CommentViewSet(viewsets.ModelViewSet):
+class CommentViewSet(AsyncReadMixin, ConditionalMixin,
+                     viewsets.ModelViewSet):
     serializer_class = CommentSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminModeratorAuthorOrReadOnly,)
+    pagination_class = LimitOffsetOrCursorPagination
 
     def get_review(self):
-        return get_object_or_404(Review, id=self.kwargs['review_id'])
+        """Отзыв из URL вместе с произведением, один запрос за запрос.
+
+        Отзыв ищется только среди отзывов произведения из URL, поэтому
+        чужой title_id даёт 404.
+        """
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review.objects.select_related('title'),
+                id=self.kwargs['review_id'],
+                title_id=self.kwargs['title_id'],
+            )
+        return self._review
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['review'] = self.get_review()
+        context['title'] = context['review'].title
+        return context
 
+    def get_list_marker(self):
+        # Любое изменение комментариев обновляет updated_at отзыва.
+        return self.get_review().updated_at
+
+    @immediate_atomic
     def perform_create(self, serializer):
         serializer.save(author=self.request.user, review=self.get_review())
+        Review.touch(self.get_review().pk)
+
+    @immediate_atomic
+    def perform_update(self, serializer):
+        serializer.save()
+        Review.touch(self.get_review().pk)
+
+    @immediate_atomic
+    def perform_destroy(self, instance):
+        instance.delete()
+        Review.touch(self.get_review().pk)
 
     def get_queryset(self):
-        review = self.get_review()
-        return review.comments.all()
+        return self.get_review().comments.select_related('author')
 
 
 class CategoryViewSet(CreateListDestroyViewSet):
@@ -114,6 +215,9 @@ class CategoryViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
+    bulk_unique_fields = ('slug',)
+    touch_titles_filter = 'category__in'
 
 
 class GenreViewSet(CreateListDestroyViewSet):
@@ -125,22 +229,94 @@ class GenreViewSet(CreateListDestroyViewSet):
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
     lookup_field = 'slug'
+    bulk_lookup_field = 'slug'
+    bulk_unique_fields = ('slug',)
+    touch_titles_filter = 'genre__in'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
+class TitleViewSet(AsyncReadMixin, ConditionalMixin, BulkWriteMixin,
+                   viewsets.ModelViewSet):
     """Получение списка всех произведений."""
-    queryset = Title.objects.all().annotate(
-        rating=Avg('reviews__score')).order_by('-rating')
+    queryset = Title.objects.select_related('category').prefetch_related(
+        'genre'
+    ).order_by('-rating', 'id')
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitlesFilter
     permission_classes = (IsAuthenticatedOrReadOnly,
                           IsAdminOrReadOnly,)
+    bulk_related_fields = {'category': Category, 'genre': Genre}
+    pagination_class = VersionedLimitOffsetPagination
+
+    def get_list_marker(self):
+        # Без условного заголовка метку уже посчитал пагинатор.
+        marker = getattr(self.paginator, 'marker', None)
+        return marker if marker is not None else super().get_list_marker()
+
+    def perform_bulk_create(self, rows):
+        genres = [row.pop('genre') for row in rows]
+        titles = insert_all(Title, [Title(**row) for row in rows])
+        GenreTitle.objects.bulk_create(
+            GenreTitle(title=title, genre=genre)
+            for title, title_genres in zip(titles, genres)
+            for genre in set(title_genres)
+        )
+        return titles
+
+    def perform_bulk_update(self, changes):
+        genres = {
+            instance.pk: data.pop('genre')
+            for instance, data in changes if 'genre' in data
+        }
+        titles = super().perform_bulk_update(changes)
+        if genres:
+            GenreTitle.objects.filter(title_id__in=genres).delete()
+            GenreTitle.objects.bulk_create(
+                GenreTitle(title_id=pk, genre=genre)
+                for pk, title_genres in genres.items()
+                for genre in set(title_genres)
+            )
+        return titles
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
             return TitleReadSerializer
         return TitleWriteSerializer
 
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        """Произведения по списку ?ids=1,2,3 в порядке запроса."""
+        raw_ids = request.query_params.get('ids', '')
+        try:
+            ids = list(dict.fromkeys(int(pk) for pk in raw_ids.split(',')))
+        except ValueError:
+            return Response(
+                {'ids': ['Ожидается список id через запятую.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if len(ids) > settings.TITLES_BATCH_MAX_IDS:
+            return Response(
+                {'ids': [f'Не больше {settings.TITLES_BATCH_MAX_IDS} id '
+                         'за запрос.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = TitleReadSerializer(
+            [titles[pk] for pk in ids if pk in titles], many=True
+        )
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def stats(self, request, pk=None):
+        """Число отзывов, средняя оценка и гистограмма оценок."""
+        title = get_object_or_404(
+            Title.objects.only('rating', 'rating_count').prefetch_related(
+                'score_counts'
+            ),
+            pk=pk,
+        )
+        serializer = TitleStatsSerializer(title)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
 
 class UsersViewSet(mixins.CreateModelMixin,
                    mixins.ListModelMixin,
@@ -158,6 +334,14 @@ class UsersViewSet(mixins.CreateModelMixin,
     permission_classes = (IsAdmin,)
     http_method_names = ['get', 'post', 'patch', 'delete']
 
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        invalidate_cached_user(serializer.instance.pk)
+
+    def perform_destroy(self, instance):
+        invalidate_cached_user(instance.pk)
+        super().perform_destroy(instance)
+
     @action(
         methods=['get', 'patch'],
         detail=False,
@@ -179,4 +363,43 @@ class UsersViewSet(mixins.CreateModelMixin,
         )
         serializer.is_valid(raise_exception=True)
         serializer.save()
+        invalidate_cached_user(user.pk)
         return Response(serializer.data, status=status.HTTP_200_OK)
+
+
+class SearchView(generics.GenericAPIView):
+    """Полнотекстовый поиск по произведениям, отзывам и комментариям."""
+    permission_classes = (AllowAny,)
+    max_limit = 50
+    sections = {
+        'titles': (TitleViewSet.queryset, TitleReadSerializer),
+        'reviews': (Review.objects.select_related('author'),
+                    ReviewSearchSerializer),
+        'comments': (Comment.objects.select_related('author'),
+                     CommentSerializer),
+    }
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.query_params['limit'])
+        except (KeyError, ValueError):
+            return settings.REST_FRAMEWORK['PAGE_SIZE']
+        return min(max(limit, 1), self.max_limit)
+
+    def get(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response(
+                {'q': ['Обязательный параметр.']},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        requested = request.query_params.get('type')
+        backend = get_search_backend()
+        limit = self.get_limit()
+        result = {}
+        for section, (queryset, serializer_class) in self.sections.items():
+            if requested and requested != section:
+                continue
+            found = backend.rank(queryset.all(), query, limit)
+            result[section] = serializer_class(found, many=True).data
+        return Response(result, status=status.HTTP_200_OK)
@@ -0,0 +1,41 @@
+"""Настройки кеша из переменной окружения CACHE_URL.
+
+locmem://                    память процесса (по умолчанию)
+file:///var/tmp/yamdb-cache  файлы в каталоге
+db://yamdb_cache             таблица в базе, создаётся createcachetable
+memcached://host:11211,...   memcached через pymemcache
+
+Кеш хранит отметки ReplicaMiddleware и должен быть общим для всех
+воркеров, если заданы DB_REPLICAS: locmem:// годится только для одного
+процесса. При репликах с кешем в памяти процесса manage.py check выдаёт
+предупреждение api.W001.
+"""
+from urllib.parse import unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+BACKENDS = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'file': 'django.core.cache.backends.filebased.FileBasedCache',
+    'db': 'django.core.cache.backends.db.DatabaseCache',
+    'memcached': 'django.core.cache.backends.memcached.PyMemcacheCache',
+}
+
+
+def parse_cache_url(url):
+    """Словарь для CACHES['default']."""
+    parts = urlsplit(url)
+    if parts.scheme not in BACKENDS:
+        raise ImproperlyConfigured(
+            f'Unsupported cache scheme {parts.scheme!r} in {url!r}'
+        )
+    cache = {'BACKEND': BACKENDS[parts.scheme]}
+    if parts.scheme == 'file':
+        cache['LOCATION'] = unquote(parts.path)
+    elif parts.scheme == 'db':
+        cache['LOCATION'] = unquote(parts.netloc or parts.path.lstrip('/'))
+    elif parts.scheme == 'memcached':
+        cache['LOCATION'] = parts.netloc.split(',')
+    if parts.scheme != 'locmem' and not cache['LOCATION']:
+        raise ImproperlyConfigured(f'Cache location is missing in {url!r}')
+    return cache
@@ -2,6 +2,8 @@ import os
 from datetime import timedelta
 from pathlib import Path
 
+from api_yamdb.cache_settings import parse_cache_url
+from api_yamdb.db_settings import TRUE_VALUES, database_settings
 from django.core.management.utils import get_random_secret_key
 
 BASE_DIR = Path(__file__).resolve().parent.parent
@@ -32,12 +34,14 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'api.compression.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'api.replicas.ReplicaMiddleware',
 ]
 
 ROOT_URLCONF = 'api_yamdb.urls'
@@ -65,11 +69,32 @@ WSGI_APPLICATION = 'api_yamdb.wsgi.application'
 # Database
 
 DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+    'default': database_settings(
+        os.getenv('DATABASE_URL', f'sqlite:///{BASE_DIR / "db.sqlite3"}')
+    ),
+}
+
+# Реплики только для чтения: адреса баз через запятую в DB_REPLICAS.
+for number, url in enumerate(
+        filter(None, os.getenv('DB_REPLICAS', '').split(',')), 1):
+    DATABASES[f'replica{number}'] = {
+        **database_settings(url),
+        'TEST': {'MIRROR': 'default'},
     }
+
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != 'default']
+DATABASE_ROUTERS = ['api.replicas.ReplicaRouter']
+# Сколько секунд после записи клиент читает с primary. Отметки хранятся
+# в кеше, поэтому с репликами CACHE_URL должен указывать на общий кеш.
+REPLICA_STICKINESS = 5
+
+CACHES = {
+    'default': parse_cache_url(os.getenv('CACHE_URL', 'locmem://')),
 }
+# Повторы BEGIN IMMEDIATE на SQLite сверх busy_timeout и пауза в секундах
+# перед первым из них; каждая следующая пауза вдвое длиннее.
+DB_LOCK_RETRIES = 3
+DB_LOCK_RETRY_DELAY = 0.05
 
 
 # Password validation
@@ -111,13 +136,32 @@ STATICFILES_DIRS = ((BASE_DIR / 'static/'),)
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+# Письма копятся в очереди и отправляются командой send_emails;
+# EMAIL_OUTBOX_ENABLED=false отправляет их сразу, в запросе.
+EMAIL_OUTBOX_ENABLED = (
+    os.getenv('EMAIL_OUTBOX_ENABLED', 'true').lower() in TRUE_VALUES
+)
+EMAIL_OUTBOX_BATCH_SIZE = 100
+EMAIL_OUTBOX_MAX_ATTEMPTS = 5
+EMAIL_OUTBOX_RETRY_DELAY = 60
+# Сколько секунд письмо закреплено за отправителем, забравшим его.
+EMAIL_OUTBOX_CLAIM_TIMEOUT = 300
 
 REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
+    ],
+    'DEFAULT_RENDERER_CLASSES': [
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'api.parsers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
     ],
     'DEFAULT_PAGINATION_CLASS':
         'rest_framework.pagination.LimitOffsetPagination',
@@ -156,6 +200,27 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_REFRESH_LIFETIME': timedelta(days=1),
 }
 
+JWT_USER_CACHE_TIMEOUT = 30
+
+LIST_CACHE_TIMEOUT = 60 * 15
+
+# Меньшие ответы не сжимаются: выигрыш меньше накладных расходов.
+COMPRESSION_MIN_SIZE = 1024
+
+COMPRESSION_CACHE_TIMEOUT = LIST_CACHE_TIMEOUT
+
+TITLES_BATCH_MAX_IDS = 200
+
+BULK_MAX_ITEMS = 500
+
+EXPORT_CHUNK_SIZE = 1000
+
+# Чтения titles, reviews и comments под ASGI идут параллельно в пуле
+# потоков; для серверных баз включается в asgi.py, для SQLite —
+# только явно, DJANGO_ASYNC_READS=true.
+ASYNC_READS = os.getenv('DJANGO_ASYNC_READS', 'false').lower() in TRUE_VALUES
+ASYNC_READ_WORKERS = int(os.getenv('DJANGO_ASYNC_READ_WORKERS', 8))
+
 # Сonstants
 
 TEXT_LENGTH = 15
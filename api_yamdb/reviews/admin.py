@@ -3,7 +3,8 @@ from reviews.models import Category, Comment, Genre, Review, Title
 
 
 class TitleAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'name', 'category',)
+    list_display = ('pk', 'name', 'category', 'rating',)
+    readonly_fields = ('rating_sum', 'rating_count', 'rating',)
     search_fields = ('name',)
     list_filter = ('category',)
     empty_value_display = '-пусто-'
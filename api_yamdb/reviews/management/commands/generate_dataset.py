@@ -0,0 +1,202 @@
+import csv
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.core.management import BaseCommand, call_command
+from django.db import transaction
+from django.db.models import Max
+from reviews.management.commands.load_csv import (CSV_DATA, load_rows,
+                                                  reset_sequences)
+
+WORDS = ('фильм', 'книга', 'музыка', 'сюжет', 'герой', 'финал', 'актёр',
+         'режиссёр', 'автор', 'сцена', 'смысл', 'ритм', 'голос', 'история',
+         'классика', 'шедевр', 'провал', 'скучно', 'сильно', 'красиво',
+         'неожиданно', 'глубоко', 'смешно', 'страшно', 'долго', 'ярко')
+START_DATE = datetime(2015, 1, 1, tzinfo=timezone.utc)
+DATE_RANGE = timedelta(days=365 * 8).total_seconds()
+
+
+class DatasetGenerator:
+    """Строки всех таблиц в формате static/data/*.csv.
+
+    Число отзывов на произведение убывает по закону Ципфа от случайно
+    выбранных «горячих» произведений; число жанров и комментариев тоже
+    случайно. Один и тот же seed всегда даёт один и тот же набор.
+    """
+
+    def __init__(self, options, first_ids):
+        self.options = options
+        self.first_ids = first_ids
+        self.rng = random.Random(options['seed'])
+        self.users = options['users']
+        self.titles = options['titles']
+        self.genres = options['genres']
+        self.categories = options['categories']
+        # Даты отзывов нужны комментариям; array держит их компактно.
+        self.review_dates = array('d')
+
+    def text(self, low, high):
+        words = self.rng.choices(WORDS, k=self.rng.randint(low, high))
+        return ' '.join(words).capitalize()
+
+    def pub_date(self, after=None):
+        start = after or START_DATE
+        seconds = self.rng.uniform(
+            0, DATE_RANGE - (start - START_DATE).total_seconds()
+        )
+        return start + timedelta(seconds=seconds)
+
+    def ids(self, model, count):
+        first = self.first_ids[model]
+        return range(first, first + count)
+
+    def rows(self, model):
+        return getattr(self, f'{model._meta.model_name}_rows')()
+
+    def user_rows(self):
+        for pk in self.ids('User', self.users):
+            yield {'id': pk, 'username': f'gen-user-{pk}',
+                   'email': f'gen-user-{pk}@yamdb.fake', 'role': 'user',
+                   'bio': '', 'first_name': '', 'last_name': ''}
+
+    def category_rows(self):
+        for pk in self.ids('Category', self.categories):
+            yield {'id': pk, 'name': f'Категория {pk}',
+                   'slug': f'gen-category-{pk}'}
+
+    def genre_rows(self):
+        for pk in self.ids('Genre', self.genres):
+            yield {'id': pk, 'name': f'Жанр {pk}', 'slug': f'gen-genre-{pk}'}
+
+    def title_rows(self):
+        categories = self.ids('Category', self.categories)
+        for pk in self.ids('Title', self.titles):
+            yield {'id': pk, 'name': self.text(1, 4),
+                   'year': self.rng.randint(1950, 2022),
+                   'category': self.rng.choice(categories)}
+
+    def genretitle_rows(self):
+        genres = self.ids('Genre', self.genres)
+        pk = self.first_ids['GenreTitle']
+        for title in self.ids('Title', self.titles):
+            count = min(self.rng.choice((1, 1, 2, 2, 3, 4)), len(genres))
+            for genre in self.rng.sample(genres, count):
+                yield {'id': pk, 'title_id': title, 'genre_id': genre}
+                pk += 1
+
+    def review_rows(self):
+        titles = list(self.ids('Title', self.titles))
+        self.rng.shuffle(titles)
+        users = self.ids('User', self.users)
+        max_reviews = min(self.options['max_reviews'], self.users)
+        pk = self.first_ids['Review']
+        for rank, title in enumerate(titles, 1):
+            count = int(max_reviews / rank ** self.options['zipf'])
+            for author in self.rng.sample(users, count):
+                pub_date = self.pub_date()
+                self.review_dates.append(pub_date.timestamp())
+                yield {'id': pk, 'title_id': title, 'text': self.text(5, 40),
+                       'author': author, 'score': self.rng.randint(1, 10),
+                       'pub_date': pub_date.isoformat()}
+                pk += 1
+
+    def comment_rows(self):
+        users = self.ids('User', self.users)
+        mean = self.options['comments_mean']
+        pk = self.first_ids['Comment']
+        first_review = self.first_ids['Review']
+        for number, timestamp in enumerate(self.review_dates):
+            review_date = datetime.fromtimestamp(timestamp, timezone.utc)
+            count = int(self.rng.expovariate(1 / mean)) if mean else 0
+            for _ in range(count):
+                yield {'id': pk, 'review_id': first_review + number,
+                       'text': self.text(3, 20),
+                       'author': self.rng.choice(users),
+                       'pub_date': self.pub_date(review_date).isoformat()}
+                pk += 1
+
+
+class Command(BaseCommand):
+    help = "Generates a skewed synthetic dataset for load testing"
+
+    def add_arguments(self, parser):
+        parser.add_argument('--titles', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=2000)
+        parser.add_argument('--genres', type=int, default=20)
+        parser.add_argument('--categories', type=int, default=5)
+        parser.add_argument(
+            '--max-reviews', type=int, default=2000,
+            help='Reviews of the hottest title, capped by --users',
+        )
+        parser.add_argument(
+            '--zipf', type=float, default=1.0,
+            help='Zipf exponent of reviews per title',
+        )
+        parser.add_argument(
+            '--comments-mean', type=float, default=2,
+            help='Mean comments per review (exponential distribution)',
+        )
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument(
+            '--csv', type=Path,
+            help='Write csv files in static/data format instead of '
+                 'inserting into the database',
+        )
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        started = time.monotonic()
+        if options['csv']:
+            first_ids = {model.__name__: 1 for model, _, _ in CSV_DATA}
+        else:
+            first_ids = {
+                model.__name__:
+                    (model.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+                for model, _, _ in CSV_DATA
+            }
+        generator = DatasetGenerator(options, first_ids)
+        total = 0
+        with transaction.atomic():
+            for model, csv_file, columns in CSV_DATA:
+                rows = generator.rows(model)
+                if options['csv']:
+                    count = self.write_csv(options['csv'] / csv_file, rows)
+                else:
+                    count = load_rows(
+                        model, self.rename(rows, columns),
+                        options['batch_size'],
+                    )
+                total += count
+                self.stdout.write(f'{model._meta.label}: {count} rows')
+            if not options['csv']:
+                # id заданы явно, поэтому последовательности PostgreSQL
+                # сами не сдвинутся.
+                reset_sequences([model for model, _, _ in CSV_DATA])
+        if not options['csv']:
+            call_command('recalculate_ratings', stdout=self.stdout)
+        self.stdout.write(
+            f'Generated {total} rows in {time.monotonic() - started:.1f}s'
+        )
+
+    @staticmethod
+    def rename(rows, columns):
+        for row in rows:
+            yield {columns.get(column, column): value
+                   for column, value in row.items()}
+
+    @staticmethod
+    def write_csv(path, rows):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        count = 0
+        with open(path, 'w', encoding='utf-8', newline='') as csv_file:
+            writer = None
+            for row in rows:
+                if writer is None:
+                    writer = csv.DictWriter(csv_file, fieldnames=list(row))
+                    writer.writeheader()
+                writer.writerow(row)
+                count += 1
+        return count
@@ -1,8 +1,17 @@
 import csv
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from itertools import islice
+from pathlib import Path
 
-from django.core.management import BaseCommand
-from reviews.models import (Category, Comment, Genre, GenreTitle, Review,
-                            Title, User)
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.management import BaseCommand, CommandError, call_command
+from django.core.management.color import no_style
+from django.db import connection, transaction
+from reviews.models import (Category, Comment, Genre, GenreTitle,
+                            ImportChunk, Review, Title, User)
 
 ALREDY_LOADED_ERROR_MESSAGE = """
 If you need to reload the data from the CSV file,
@@ -10,102 +19,231 @@ first delete the db.sqlite3 file to destroy the database.
 Then, run `python manage.py migrate` for a new empty
 database with tables"""
 
+# Порядок важен: каждая таблица ссылается только на загруженные раньше.
+CSV_DATA = ((User, 'users.csv', {}),
+            (Category, 'category.csv', {}),
+            (Genre, 'genre.csv', {}),
+            (Title, 'titles.csv', {'category': 'category_id'}),
+            (GenreTitle, 'genre_title.csv', {}),
+            (Review, 'review.csv', {'author': 'author_id'}),
+            (Comment, 'comments.csv', {'author': 'author_id'}))
 
-CSV_DATA = {Category: 'category.csv',
-            Comment: 'comment.csv',
-            GenreTitle: 'genre_title.csv',
-            Genre: 'genre.csv',
-            Review: 'review.csv',
-            Title: 'titles.csv',
-            User: 'users.csv'}
+DEFAULT_DATA_DIR = settings.BASE_DIR / 'static' / 'data'
+
+
+def read_rows(path, columns):
+    """Построчно читает CSV, переименовывая колонки в поля модели."""
+    with open(path, encoding='utf-8', newline='') as csv_file:
+        for row in csv.DictReader(csv_file, delimiter=','):
+            values = {}
+            for column, value in row.items():
+                field = columns.get(column, column)
+                if value == '' and field.endswith('_id'):
+                    value = None
+                values[field] = value
+            yield values
+
+
+def batches(iterable, size):
+    iterator = iter(iterable)
+    batch = list(islice(iterator, size))
+    while batch:
+        yield batch
+        batch = list(islice(iterator, size))
+
+
+@contextmanager
+def keep_pub_date(model):
+    """Не даёт auto_now_add перезаписать даты из файла при bulk_create."""
+    fields = [field for field in model._meta.concrete_fields
+              if getattr(field, 'auto_now_add', False)]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+def build_object(model, row):
+    if model is User:
+        row.setdefault('password', make_password(None))
+    return model(**row)
+
+
+def load_rows(model, rows, batch_size):
+    """Вставляет строки пачками, возвращает число вставленных строк."""
+    count = 0
+    with keep_pub_date(model):
+        for batch in batches(rows, batch_size):
+            model.objects.bulk_create(
+                [build_object(model, row) for row in batch],
+                batch_size=batch_size,
+            )
+            count += len(batch)
+    return count
+
+
+def load_chunk(model, number, rows, batch_size, close_connection,
+               checkpoint):
+    """Загружает часть файла вместе с отметкой о ней в одной транзакции.
+
+    После сбоя транзакция части откатывается целиком, поэтому при
+    повторном запуске она загрузится заново, а отмеченные — пропустятся.
+    """
+    try:
+        with transaction.atomic():
+            count = load_rows(model, rows, batch_size)
+            ImportChunk.objects.create(
+                table=model._meta.label, chunk=number, rows=count,
+                **checkpoint
+            )
+        return count
+    finally:
+        if close_connection:
+            connection.close()
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
 
 
 class Command(BaseCommand):
     help = "Loads data from csv files"
 
-    def handle(self, *args, **kwargs):
-        for model, csv_file in CSV_DATA:
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', type=Path, default=DEFAULT_DATA_DIR,
+            help='Directory with the csv files',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Rows per INSERT statement',
+        )
+        parser.add_argument(
+            '--resumable', action='store_true',
+            help='Load files in checkpointed chunks, skipping loaded ones',
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=50000,
+            help='Rows per checkpointed chunk in resumable mode',
+        )
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Parallel chunk loaders in resumable mode (not on SQLite)',
+        )
+
+    def handle(self, *args, **options):
+        if options['resumable']:
+            return self.handle_resumable(**options)
+        for model, csv_file, columns in CSV_DATA:
             if model.objects.exists():
-                print('data already loaded...exiting.')
-                print(ALREDY_LOADED_ERROR_MESSAGE)
+                self.stdout.write('data already loaded...exiting.')
+                self.stdout.write(ALREDY_LOADED_ERROR_MESSAGE)
                 return
 
-        with open('category.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                category = Category(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
-                category.save()
-
-        with open('comments.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                comment = Comment(
-                    id=row['id'],
-                    review_id=row['review_id'],
-                    text=row['text'],
-                    author=row['author'],
-                    pub_date=row['pub_date'],
-                )
-                comment.save()
-
-        with open('genre_title.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                genretitle = GenreTitle(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    genre_id=row['genre_id'],
-                )
-                genretitle.save()
-
-        with open('genre.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                genre = Genre(
-                    id=row['id'],
-                    name=row['name'],
-                    slug=row['slug'],
-                )
-                genre.save()
-
-        with open('review.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                review = Review(
-                    id=row['id'],
-                    title_id=row['title_id'],
-                    text=row['text'],
-                    author=row['author'],
-                    score=row['score'],
-                    pub_date=row['pub_date'],
+        started = time.monotonic()
+        total = 0
+        with transaction.atomic():
+            for model, csv_file, columns in CSV_DATA:
+                table_started = time.monotonic()
+                count = load_rows(
+                    model,
+                    read_rows(options['path'] / csv_file, columns),
+                    options['batch_size'],
                 )
-                review.save()
-
-        with open('titles.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                title = Title(
-                    id=row['id'],
-                    name=row['name'],
-                    year=row['year'],
-                    category=row['category'],
-                )
-                title.save()
-
-        with open('users.csv', encoding='utf-8') as csv_file:
-            csv_reader = csv.DictReader(csv_file, delimiter=',')
-            for row in csv_reader:
-                user = User(
-                    id=row['id'],
-                    username=row['username'],
-                    email=row['email'],
-                    role=row['role'],
-                    bio=row['bio'],
-                    first_name=row['first_name'],
-                    last_name=row['last_name'],
+                total += count
+                self.report(model, count, table_started)
+            reset_sequences([model for model, _, _ in CSV_DATA])
+        call_command('recalculate_ratings', stdout=self.stdout)
+        self.report(None, total, started)
+
+    def handle_resumable(self, **options):
+        workers = options['workers']
+        if workers > 1 and connection.vendor == 'sqlite':
+            self.stdout.write('SQLite allows one writer, using 1 worker')
+            workers = 1
+        checkpoints = self.check_checkpoints(options)
+        started = time.monotonic()
+        total = 0
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            # Таблицы грузятся строго по очереди ради внешних ключей,
+            # параллельно идут только части одной таблицы.
+            for model, csv_file, columns in CSV_DATA:
+                table_started = time.monotonic()
+                with keep_pub_date(model):
+                    count = self.load_table_chunks(
+                        executor, workers, model,
+                        read_rows(options['path'] / csv_file, columns),
+                        options, checkpoints[model],
+                    )
+                total += count
+                self.report(model, count, table_started)
+        reset_sequences([model for model, _, _ in CSV_DATA])
+        call_command('recalculate_ratings', stdout=self.stdout)
+        self.report(None, total, started)
+
+    def check_checkpoints(self, options):
+        """Возвращает параметры отметок о частях для каждой таблицы.
+
+        Номер части указывает на те же строки, только если размер части
+        и файл не изменились, поэтому отметки прошлого запуска с другими
+        параметрами прерывают загрузку, а не пропускают чужие строки.
+        """
+        checkpoints = {}
+        for model, csv_file, _ in CSV_DATA:
+            checkpoint = {
+                'chunk_size': options['chunk_size'],
+                'file_size': (options['path'] / csv_file).stat().st_size,
+            }
+            stale = ImportChunk.objects.filter(
+                table=model._meta.label
+            ).exclude(**checkpoint).values('chunk_size', 'file_size').first()
+            if stale is not None:
+                raise CommandError(
+                    f'{model._meta.label}: chunks were loaded with '
+                    f'--chunk-size {stale["chunk_size"]} from a '
+                    f'{stale["file_size"]}-byte {csv_file}, now '
+                    f'--chunk-size {checkpoint["chunk_size"]} and '
+                    f'{checkpoint["file_size"]} bytes. Rerun with the same '
+                    f'options and file, or delete the ImportChunk rows and '
+                    f'the loaded data.'
                 )
-                user.save()
+            checkpoints[model] = checkpoint
+        return checkpoints
+
+    def load_table_chunks(self, executor, workers, model, rows, options,
+                          checkpoint):
+        done = set(ImportChunk.objects.filter(
+            table=model._meta.label
+        ).values_list('chunk', flat=True))
+        count = 0
+        pending = set()
+        for number, chunk in enumerate(batches(rows, options['chunk_size'])):
+            if number in done:
+                continue
+            if len(pending) >= workers * 2:
+                finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                count += sum(future.result() for future in finished)
+            pending.add(executor.submit(
+                load_chunk, model, number, chunk,
+                options['batch_size'], workers > 1, checkpoint,
+            ))
+        count += sum(future.result() for future in wait(pending).done)
+        if done:
+            self.stdout.write(
+                f'{model._meta.label}: skipped {len(done)} loaded chunks'
+            )
+        return count
+
+    def report(self, model, count, started):
+        elapsed = time.monotonic() - started
+        target = model._meta.label if model else 'total'
+        self.stdout.write(
+            f'{target}: {count} rows in {elapsed:.2f}s '
+            f'({count / elapsed if elapsed else count:.0f} rows/s)'
+        )
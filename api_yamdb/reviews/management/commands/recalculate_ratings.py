@@ -0,0 +1,51 @@
+from django.core.management import BaseCommand
+from django.db import transaction
+from django.db.models import (Avg, Count, F, IntegerField, OuterRef, Q,
+                              Subquery, Sum)
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from reviews.models import Review, ScoreCount, Title
+
+
+class Command(BaseCommand):
+    help = "Recalculates stored title ratings and score histograms"
+
+    @transaction.atomic
+    def handle(self, *args, **kwargs):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk')
+        ).order_by().values('title')
+        rating_sum = Coalesce(
+            Subquery(reviews.annotate(s=Sum('score')).values('s')),
+            0,
+            output_field=IntegerField(),
+        )
+        rating_count = Coalesce(
+            Subquery(reviews.annotate(c=Count('id')).values('c')),
+            0,
+            output_field=IntegerField(),
+        )
+        # Средняя задаётся суммой и числом оценок, поэтому трогаем только
+        # произведения, где они разошлись: их updated_at входит в ETag.
+        changed = Title.objects.annotate(
+            new_sum=rating_sum, new_count=rating_count
+        ).filter(
+            ~Q(rating_sum=F('new_sum')) | ~Q(rating_count=F('new_count'))
+        ).values('pk')
+        updated = Title.objects.filter(pk__in=changed).update(
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Subquery(reviews.annotate(a=Avg('score')).values('a')),
+            updated_at=timezone.now(),
+        )
+        histogram = Review.objects.values('title', 'score').annotate(
+            count=Count('id')
+        ).order_by()
+        ScoreCount.objects.all().delete()
+        ScoreCount.objects.bulk_create(
+            (ScoreCount(title_id=row['title'], score=row['score'],
+                        count=row['count'])
+             for row in histogram.iterator()),
+            batch_size=1000,
+        )
+        self.stdout.write(f'Ratings changed for {updated} titles')
@@ -0,0 +1,28 @@
+# Generated by Django 3.2 on 2026-10-18 19:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_pub_date_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImportChunk',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('table', models.CharField(max_length=100, verbose_name='Таблица')),
+                ('chunk', models.PositiveIntegerField(verbose_name='Номер части')),
+                ('rows', models.PositiveIntegerField(verbose_name='Строк')),
+                ('loaded_at', models.DateTimeField(auto_now_add=True, verbose_name='Загружено')),
+            ],
+            options={
+                'verbose_name': 'Загруженная часть импорта',
+                'verbose_name_plural': 'Загруженные части импорта',
+                'unique_together': {('table', 'chunk')},
+            },
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import migrations
+
+FTS_TABLES = (
+    ('reviews_title', ('name', 'description')),
+    ('reviews_review', ('text',)),
+    ('reviews_comment', ('text',)),
+)
+
+
+def fts_statements(table, columns):
+    fts = f'{table}_fts'
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    insert = f'INSERT INTO {fts}(rowid, {names}) VALUES (new.id, {new});'
+    delete = (f"INSERT INTO {fts}({fts}, rowid, {names}) "
+              f"VALUES ('delete', old.id, {old});")
+    return (
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({names}, "
+        f"content='{table}', content_rowid='id', "
+        f"tokenize='unicode61 remove_diacritics 2');",
+        f'CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} '
+        f'BEGIN {insert} END;',
+        f'CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} '
+        f'BEGIN {delete} END;',
+        f'CREATE TRIGGER {fts}_au AFTER UPDATE OF {names} ON {table} '
+        f'BEGIN {delete} {insert} END;',
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild');",
+    )
+
+
+def create_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in FTS_TABLES:
+        for statement in fts_statements(table, columns):
+            schema_editor.execute(statement)
+
+
+def drop_fts(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, _ in FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(f'DROP TRIGGER IF EXISTS {table}_fts_{suffix};')
+        schema_editor.execute(f'DROP TABLE IF EXISTS {table}_fts;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_importchunk'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_fts, drop_fts),
+    ]
@@ -0,0 +1,101 @@
+# Generated by Django 3.2 on 2026-10-18 19:27
+
+import django.core.validators
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def delete_duplicate_genres(apps, schema_editor):
+    GenreTitle = apps.get_model('reviews', 'GenreTitle')
+    duplicates = GenreTitle.objects.values('genre', 'title').annotate(
+        first=Min('id'), count=Count('id')
+    ).filter(count__gt=1).order_by()
+    for row in duplicates:
+        GenreTitle.objects.filter(
+            genre=row['genre'], title=row['title']
+        ).exclude(id=row['first']).delete()
+
+
+SINGLE_COLUMN_INDEXES = ('name', 'year', 'rating')
+
+
+def drop_single_column_indexes(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        constraints = connection.introspection.get_constraints(
+            cursor, Title._meta.db_table
+        )
+    for name, info in constraints.items():
+        if (info['index'] and not info['unique']
+                and len(info['columns']) == 1
+                and info['columns'][0] in SINGLE_COLUMN_INDEXES):
+            schema_editor.execute(schema_editor._delete_index_sql(Title, name))
+
+
+def create_single_column_indexes(apps, schema_editor):
+    Title = apps.get_model('reviews', 'Title')
+    for name in SINGLE_COLUMN_INDEXES:
+        schema_editor.execute(schema_editor._create_index_sql(
+            Title, fields=[Title._meta.get_field(name)]
+        ))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_scorecount'),
+    ]
+
+    operations = [
+        # AlterField пересоздал бы reviews_title на SQLite и потерял
+        # триггеры полнотекстового поиска, поэтому индексы удаляются
+        # отдельно, а поля меняются только в состоянии миграций.
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(
+                    drop_single_column_indexes, create_single_column_indexes
+                ),
+            ],
+            state_operations=[
+                migrations.AlterField(
+                    model_name='title',
+                    name='name',
+                    field=models.CharField(max_length=200, verbose_name='Название'),
+                ),
+                migrations.AlterField(
+                    model_name='title',
+                    name='rating',
+                    field=models.FloatField(blank=True, null=True, verbose_name='Рейтинг'),
+                ),
+                migrations.AlterField(
+                    model_name='title',
+                    name='year',
+                    field=models.IntegerField(validators=[django.core.validators.MaxValueValidator(2026)], verbose_name='Год выпуска'),
+                ),
+            ],
+        ),
+        migrations.RunPython(
+            delete_duplicate_genres, migrations.RunPython.noop
+        ),
+        migrations.AlterUniqueTogether(
+            name='genretitle',
+            unique_together={('genre', 'title')},
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['-rating', 'id'], name='title_rating_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-rating', 'id'], name='title_category_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['name', '-rating', 'id'], name='title_name_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['year', '-rating', 'id'], name='title_year_rating_idx'),
+        ),
+    ]
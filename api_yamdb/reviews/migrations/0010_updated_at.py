@@ -0,0 +1,53 @@
+# Generated by Django 3.2 on 2026-10-18 19:42
+
+from importlib import import_module
+
+from django.db import migrations, models
+
+fulltext = import_module('reviews.migrations.0007_fulltext_search')
+
+
+def restore_fts_triggers(apps, schema_editor):
+    """AddField на SQLite пересоздаёт таблицы и теряет их триггеры."""
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for table, columns in fulltext.FTS_TABLES:
+        for suffix in ('ai', 'ad', 'au'):
+            schema_editor.execute(
+                f'DROP TRIGGER IF EXISTS {table}_fts_{suffix};'
+            )
+        # Сами FTS-таблицы не пострадали: только триггеры.
+        for statement in fulltext.fts_statements(table, columns)[1:4]:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_title_filter_indexes'),
+    ]
+
+    operations = [
+        # При откате RemoveField тоже пересоздаёт таблицы.
+        migrations.RunPython(
+            migrations.RunPython.noop, restore_fts_triggers
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.AddField(
+            model_name='title',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Дата изменения'),
+        ),
+        migrations.RunPython(
+            restore_fts_triggers, migrations.RunPython.noop
+        ),
+    ]
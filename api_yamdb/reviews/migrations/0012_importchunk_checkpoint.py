@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 20:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_category_genre_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='importchunk',
+            name='chunk_size',
+            field=models.PositiveIntegerField(default=0, verbose_name='Строк в части'),
+        ),
+        migrations.AddField(
+            model_name='importchunk',
+            name='file_size',
+            field=models.BigIntegerField(default=0, verbose_name='Размер файла, байт'),
+        ),
+    ]
@@ -1,6 +1,8 @@
 from django.conf import settings
 from django.core.validators import MaxValueValidator, MinValueValidator
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Case, F, FloatField, When
+from django.db.models.functions import Cast
 from django.utils import timezone
 from users.models import User
 
@@ -14,6 +16,7 @@ class Category(models.Model):
         verbose_name='Слаг',
         unique=True,
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Категория'
@@ -32,6 +35,7 @@ class Genre(models.Model):
         verbose_name='Слаг',
         unique=True,
     )
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Жанр'
@@ -45,7 +49,6 @@ class Title(models.Model):
     name = models.CharField(
         verbose_name='Название',
         max_length=200,
-        db_index=True,
     )
     description = models.TextField(
         blank=True,
@@ -55,7 +58,6 @@ class Title(models.Model):
     year = models.IntegerField(
         validators=[MaxValueValidator(timezone.now().year)],
         verbose_name='Год выпуска',
-        db_index=True,
     )
     category = models.ForeignKey(
         Category,
@@ -71,23 +73,127 @@ class Title(models.Model):
         related_name='genre',
         verbose_name='Жанр',
     )
+    rating_sum = models.PositiveIntegerField(
+        verbose_name='Сумма оценок',
+        default=0,
+    )
+    rating_count = models.PositiveIntegerField(
+        verbose_name='Количество оценок',
+        default=0,
+    )
+    rating = models.FloatField(
+        verbose_name='Рейтинг',
+        blank=True,
+        null=True,
+    )
+    # Меняется и при изменении отзывов: change_rating обновляет его
+    # вместе с рейтингом, поэтому это метка версии списка отзывов.
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        # Под сортировку списка ('-rating', 'id'), в том числе после
+        # фильтра по категории, названию или году; жанр ищется через
+        # уникальный индекс GenreTitle (genre, title).
+        indexes = (
+            models.Index(
+                fields=('-rating', 'id'), name='title_rating_id_idx',
+            ),
+            models.Index(
+                fields=('category', '-rating', 'id'),
+                name='title_category_rating_idx',
+            ),
+            models.Index(
+                fields=('name', '-rating', 'id'),
+                name='title_name_rating_idx',
+            ),
+            models.Index(
+                fields=('year', '-rating', 'id'),
+                name='title_year_rating_idx',
+            ),
+        )
 
     def __str__(self):
         return self.name
 
+    @classmethod
+    def apply_review_change(cls, title_id, old_score=None, new_score=None):
+        """Учитывает созданный, изменённый или удалённый отзыв
+        в рейтинге и гистограмме оценок произведения."""
+        cls.change_rating(
+            title_id,
+            (new_score or 0) - (old_score or 0),
+            (new_score is not None) - (old_score is not None),
+        )
+        if old_score == new_score:
+            return
+        if old_score is not None:
+            ScoreCount.change(title_id, old_score, -1)
+        if new_score is not None:
+            ScoreCount.change(title_id, new_score, 1)
+
+    @classmethod
+    def change_rating(cls, title_id, score_delta=0, count_delta=0):
+        """Инкрементально пересчитывает рейтинг одним UPDATE."""
+        rating_sum = F('rating_sum') + score_delta
+        rating_count = F('rating_count') + count_delta
+        cls.objects.filter(pk=title_id).update(
+            updated_at=timezone.now(),
+            rating_sum=rating_sum,
+            rating_count=rating_count,
+            rating=Case(
+                When(rating_count=-count_delta, then=None),
+                default=Cast(rating_sum, FloatField()) / rating_count,
+                output_field=FloatField(),
+            ),
+        )
+
+    @classmethod
+    def touch(cls, **filters):
+        """Отмечает в updated_at изменения из других таблиц, видимые
+        в произведении или списке его отзывов."""
+        cls.objects.filter(**filters).update(updated_at=timezone.now())
+
 
 class GenreTitle(models.Model):
     genre = models.ForeignKey(Genre, on_delete=models.CASCADE)
     title = models.ForeignKey(Title, on_delete=models.CASCADE)
 
+    class Meta:
+        unique_together = ('genre', 'title')
+
     def __str__(self):
         return f'{self.title} {self.genre}'
 
 
+class ScoreCount(models.Model):
+    title = models.ForeignKey(
+        Title, on_delete=models.CASCADE, related_name='score_counts')
+    score = models.PositiveSmallIntegerField('Оценка')
+    count = models.PositiveIntegerField('Количество', default=0)
+
+    class Meta:
+        verbose_name = 'Число оценок'
+        verbose_name_plural = 'Гистограммы оценок'
+        unique_together = ('title', 'score')
+
+    def __str__(self):
+        return f'{self.title_id}: {self.score} x {self.count}'
+
+    @classmethod
+    def change(cls, title_id, score, delta):
+        rows = cls.objects.filter(title_id=title_id, score=score)
+        if rows.update(count=F('count') + delta) or delta < 0:
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(title_id=title_id, score=score, count=delta)
+        except IntegrityError:
+            # Строку успел создать параллельный запрос.
+            rows.update(count=F('count') + delta)
+
+
 class Review(models.Model):
     author = models.ForeignKey(
         User, on_delete=models.CASCADE, related_name='reviews')
@@ -101,15 +207,28 @@ class Review(models.Model):
         db_index=True,
     )
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    # Обновляется и при изменении комментариев, см. touch.
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Отзыв'
         verbose_name_plural = 'Отзывы'
         unique_together = ('author', 'title')
+        indexes = (
+            models.Index(
+                fields=('title', 'pub_date', 'id'),
+                name='review_title_pub_date_id_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:settings.TEXT_LENGTH]
 
+    @classmethod
+    def touch(cls, review_id):
+        """Отмечает изменение комментариев отзыва в его updated_at."""
+        cls.objects.filter(pk=review_id).update(updated_at=timezone.now())
+
 
 class Comment(models.Model):
     author = models.ForeignKey(
@@ -118,10 +237,36 @@ class Comment(models.Model):
         Review, on_delete=models.CASCADE, related_name='comments')
     text = models.TextField()
     pub_date = models.DateTimeField('Дата публикации', auto_now_add=True)
+    updated_at = models.DateTimeField('Дата изменения', auto_now=True)
 
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('review', 'pub_date', 'id'),
+                name='comment_review_pub_date_id_idx',
+            ),
+        )
 
     def __str__(self) -> str:
         return self.text[:settings.TEXT_LENGTH]
+
+
+class ImportChunk(models.Model):
+    table = models.CharField('Таблица', max_length=100)
+    chunk = models.PositiveIntegerField('Номер части')
+    rows = models.PositiveIntegerField('Строк')
+    # Номер части однозначно задаёт строки только вместе с размером части
+    # и тем же файлом; по ним повторный запуск сверяет свои параметры.
+    chunk_size = models.PositiveIntegerField('Строк в части', default=0)
+    file_size = models.BigIntegerField('Размер файла, байт', default=0)
+    loaded_at = models.DateTimeField('Загружено', auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Загруженная часть импорта'
+        verbose_name_plural = 'Загруженные части импорта'
+        unique_together = ('table', 'chunk')
+
+    def __str__(self) -> str:
+        return f'{self.table} #{self.chunk}'
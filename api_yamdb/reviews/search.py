@@ -0,0 +1,76 @@
+import re
+
+from django.db import connection, connections
+from django.db.models import Q
+from django.db.models.expressions import RawSQL
+from reviews.models import Comment, Review, Title
+
+SEARCH_FIELDS = {
+    Title: ('name', 'description'),
+    Review: ('text',),
+    Comment: ('text',),
+}
+
+
+def fts_table(model):
+    return f'{model._meta.db_table}_fts'
+
+
+class ContainsSearch:
+    """Запасной поиск для баз без полнотекстового индекса."""
+
+    def filter(self, queryset, query):
+        terms = re.findall(r'\w+', query)
+        if not terms:
+            return queryset.none()
+        condition = Q()
+        for term in terms:
+            term_condition = Q()
+            for field in SEARCH_FIELDS[queryset.model]:
+                term_condition |= Q(**{f'{field}__icontains': term})
+            condition &= term_condition
+        return queryset.filter(condition)
+
+    def rank(self, queryset, query, limit):
+        return list(self.filter(queryset, query).order_by('-id')[:limit])
+
+
+class SQLiteFTSSearch(ContainsSearch):
+    """Поиск по таблицам FTS5, которые триггеры держат в актуальном виде."""
+
+    @staticmethod
+    def match_expression(query):
+        # Каждое слово ищется как префикс, синтаксис FTS5 не пропускаем.
+        return ' '.join(f'"{term}"*' for term in re.findall(r'\w+', query))
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        table = fts_table(queryset.model)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {table} WHERE {table} MATCH %s', (match,)
+        ))
+
+    def rank(self, queryset, query, limit):
+        """Лучшие по bm25 объекты: ранжирование и LIMIT внутри FTS5."""
+        match = self.match_expression(query)
+        if not match:
+            return []
+        table = fts_table(queryset.model)
+        # Та же база, что выберет роутер для queryset, в том числе реплика.
+        with connections[queryset.db].cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {table} WHERE {table} MATCH %s '
+                f'ORDER BY rank LIMIT %s',
+                (match, limit),
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        found = queryset.in_bulk(ids)
+        return [found[pk] for pk in ids if pk in found]
+
+
+def get_search_backend():
+    if connection.vendor == 'sqlite':
+        return SQLiteFTSSearch()
+    return ContainsSearch()
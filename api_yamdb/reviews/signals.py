@@ -0,0 +1,62 @@
+from django.db.models import Q
+from django.db.models.signals import (post_delete, post_save, pre_delete,
+                                      pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+
+@receiver(post_save, sender=Category)
+@receiver(pre_delete, sender=Category)
+def touch_category_titles(sender, instance, created=False, **kwargs):
+    """Название и slug категории выводятся в произведениях, а удаление
+    обнуляет Title.category мимо save(), поэтому updated_at
+    произведений обновляется здесь."""
+    if not created:
+        Title.touch(category=instance)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(pre_delete, sender=Genre)
+def touch_genre_titles(sender, instance, created=False, **kwargs):
+    if not created:
+        Title.touch(genre=instance)
+
+
+@receiver(post_delete, sender=Review)
+def remove_review_score(sender, instance, **kwargs):
+    """Отзыв удаляется не только через API, но и каскадом вместе с
+    автором или произведением, поэтому оценка вычитается из рейтинга
+    и гистограммы здесь, для любого пути удаления."""
+    Title.apply_review_change(instance.title_id, old_score=instance.score)
+
+
+@receiver(pre_save, sender=User)
+def touch_user_reviews(sender, instance, update_fields=None, **kwargs):
+    """Имя автора выводится в отзывах и комментариях: при его смене
+    обновляются updated_at их самих и списков, в которых они лежат."""
+    if instance.pk is None or (
+        update_fields is not None and 'username' not in update_fields
+    ):
+        return
+    old = User.objects.filter(pk=instance.pk).values_list(
+        'username', flat=True
+    ).first()
+    if old is not None and old != instance.username:
+        touch_author(instance)
+
+
+@receiver(pre_delete, sender=User)
+def touch_deleted_user_reviews(sender, instance, **kwargs):
+    # Отзывы и комментарии удаляются каскадом, мимо perform_destroy.
+    touch_author(instance)
+
+
+def touch_author(user):
+    now = timezone.now()
+    Title.touch(reviews__author=user)
+    Review.objects.filter(
+        Q(author=user) | Q(comments__author=user)
+    ).update(updated_at=now)
+    Comment.objects.filter(author=user).update(updated_at=now)
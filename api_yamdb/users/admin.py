@@ -1,7 +1,7 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
 
-from .models import User
+from .models import OutboxEmail, User
 
 
 class CustomUserAdmin(UserAdmin):
@@ -9,4 +9,10 @@ class CustomUserAdmin(UserAdmin):
     list_display = ('email', 'username',)
 
 
+class OutboxEmailAdmin(admin.ModelAdmin):
+    list_display = ('recipient', 'subject', 'created', 'attempts', 'sent_at',)
+    list_filter = ('sent_at',)
+
+
 admin.site.register(User, CustomUserAdmin)
+admin.site.register(OutboxEmail, OutboxEmailAdmin)
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.core.management import BaseCommand
+from users.outbox import deliver_pending
+
+
+class Command(BaseCommand):
+    help = "Delivers queued emails from the outbox"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.EMAIL_OUTBOX_BATCH_SIZE,
+            help='Emails sent over one connection',
+        )
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to sleep when the outbox is empty',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Drain the outbox and exit',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent = deliver_pending(options['batch_size'])
+            if sent:
+                self.stdout.write(f'Sent {sent} emails')
+                continue
+            if options['once']:
+                return
+            time.sleep(options['interval'])
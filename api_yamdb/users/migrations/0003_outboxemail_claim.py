@@ -0,0 +1,18 @@
+# Generated by Django 3.2 on 2026-10-18 20:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_outboxemail'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='outboxemail',
+            name='claim',
+            field=models.CharField(blank=True, max_length=32, verbose_name='Захвачено'),
+        ),
+    ]
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection, send_mail
+from django.db import transaction
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def queue_mail(subject, body, recipient):
+    """Ставит письмо в очередь или отправляет сразу, если очередь выключена.
+
+    Без очереди письмо уходит после коммита текущей транзакции: так оно
+    не держит блокировку записи и не уходит, если запись откатилась.
+    """
+    if not settings.EMAIL_OUTBOX_ENABLED:
+        transaction.on_commit(lambda: send_mail(
+            subject, body, from_email=None, recipient_list=[recipient]
+        ))
+        return
+    OutboxEmail.objects.create(
+        subject=subject, body=body, recipient=recipient
+    )
+
+
+def claim_pending(batch_size=None):
+    """Забирает пачку писем одним условным UPDATE и возвращает её.
+
+    UPDATE меняет только строки, которые всё ещё ждут отправки, поэтому
+    параллельный запуск получает другие письма. next_attempt_at
+    сдвигается на EMAIL_OUTBOX_CLAIM_TIMEOUT: если отправитель упал, не
+    отметив письма, их заберут снова по истечении этого срока.
+    """
+    now = timezone.now()
+    pending = OutboxEmail.objects.filter(
+        sent_at__isnull=True,
+        attempts__lt=settings.EMAIL_OUTBOX_MAX_ATTEMPTS,
+        next_attempt_at__lte=now,
+    )
+    ids = list(pending.order_by('next_attempt_at', 'id').values_list(
+        'id', flat=True
+    )[:batch_size or settings.EMAIL_OUTBOX_BATCH_SIZE])
+    if not ids:
+        return []
+    claim = uuid4().hex
+    pending.filter(id__in=ids).update(
+        claim=claim,
+        next_attempt_at=now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_CLAIM_TIMEOUT
+        ),
+    )
+    return list(OutboxEmail.objects.filter(
+        claim=claim, sent_at__isnull=True
+    ).order_by('id'))
+
+
+def deliver_pending(batch_size=None):
+    """Отправляет пачку писем через одно соединение, возвращает число
+    отправленных. Неудачные попытки откладываются с экспоненциальной
+    задержкой до EMAIL_OUTBOX_MAX_ATTEMPTS."""
+    now = timezone.now()
+    messages = claim_pending(batch_size)
+    if not messages:
+        return 0
+    sent, failed = [], []
+    try:
+        with get_connection() as connection:
+            for message in messages:
+                try:
+                    EmailMessage(
+                        message.subject,
+                        message.body,
+                        to=[message.recipient],
+                        connection=connection,
+                    ).send()
+                except Exception as error:
+                    message.last_error = repr(error)
+                    failed.append(message)
+                else:
+                    message.sent_at = timezone.now()
+                    sent.append(message)
+    except Exception as error:
+        for message in messages:
+            if message not in sent and message not in failed:
+                message.last_error = repr(error)
+                failed.append(message)
+    for message in failed:
+        message.attempts += 1
+        message.next_attempt_at = now + timedelta(
+            seconds=settings.EMAIL_OUTBOX_RETRY_DELAY
+            * 2 ** (message.attempts - 1)
+        )
+    OutboxEmail.objects.bulk_update(sent, ('sent_at',))
+    OutboxEmail.objects.bulk_update(
+        failed, ('attempts', 'next_attempt_at', 'last_error')
+    )
+    return len(sent)
@@ -0,0 +1,216 @@
+from http import HTTPStatus
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from tests.utils import create_comments, create_reviews, create_titles
+
+
+def count_queries(client, url):
+    with CaptureQueriesContext(connection) as context:
+        response = client.get(url)
+    assert response.status_code == HTTPStatus.OK, (
+        f'Проверьте, что GET-запрос к `{url}` возвращает ответ со '
+        'статусом 200.'
+    )
+    return len(context.captured_queries)
+
+
+def create_more_titles(admin_client, genres, categories, amount):
+    for idx in range(amount):
+        data = {
+            'name': f'Произведение {idx}',
+            'year': 2000 + idx,
+            'genre': [genre['slug'] for genre in genres],
+            'category': categories[idx % len(categories)]['slug'],
+        }
+        response = admin_client.post('/api/v1/titles/', data=data)
+        assert response.status_code == HTTPStatus.CREATED
+
+
+@pytest.mark.django_db(transaction=True)
+class Test08QueriesAPI:
+
+    @pytest.mark.parametrize('query', (
+        '',
+        '?genre=horror',
+        '?category=films',
+        '?genre=horror&category=films&year=1984',
+    ))
+    def test_01_titles_list_queries(self, client, admin_client, query):
+        titles, categories, genres = create_titles(admin_client)
+        url = f'/api/v1/titles/{query}'
+        queries_before = count_queries(client, url)
+
+        create_more_titles(admin_client, genres, categories, 8)
+        queries_after = count_queries(client, url)
+        assert queries_after == queries_before, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет постоянное '
+            'число запросов к базе данных независимо от количества '
+            'произведений на странице: категории и жанры должны '
+            'загружаться через `select_related` и `prefetch_related`.'
+        )
+        assert queries_after <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет не более трёх '
+            f'запросов к базе данных. Сейчас: {queries_after}.'
+        )
+
+    def test_02_title_detail_queries(self, client, admin_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/'
+        queries = count_queries(client, url)
+        assert queries <= 2, (
+            f'Проверьте, что GET-запрос к `{url}` выполняет не более двух '
+            f'запросов к базе данных. Сейчас: {queries}.'
+        )
+
+    def test_03_cached_user_authentication(self, admin_client, user_client,
+                                           user):
+        url = '/api/v1/users/me/'
+        count_queries(user_client, url)
+        queries = count_queries(user_client, url)
+        assert queries == 0, (
+            f'Проверьте, что повторный GET-запрос к `{url}` получает '
+            'пользователя из кеша без обращения к базе данных.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{user.username}/', data={'role': 'moderator'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = user_client.get(url)
+        assert response.json().get('role') == 'moderator', (
+            'Проверьте, что изменение роли пользователя администратором '
+            'сбрасывает кеш аутентификации.'
+        )
+
+    def test_04_duplicate_review_rejected_by_constraint(self, admin_client,
+                                                        user_client):
+        titles, _, _ = create_titles(admin_client)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        data = {'text': 'Отзыв', 'score': 7}
+        assert user_client.post(url, data=data).status_code == (
+            HTTPStatus.CREATED
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'non_field_errors' in response.json(), (
+            'Проверьте, что повторный отзыв возвращает ошибку в ключе '
+            '`non_field_errors`.'
+        )
+        assert not any(
+            'reviews_review' in query['sql']
+            and query['sql'].startswith('SELECT')
+            for query in context.captured_queries
+        ), (
+            'Проверьте, что уникальность отзыва проверяет ограничение базы '
+            'данных, а не отдельный SELECT перед вставкой.'
+        )
+        response = user_client.get(f'/api/v1/titles/{titles[0]["id"]}/')
+        assert response.json()['rating'] == 7
+
+    def test_05_nested_lookups(self, client, admin_client, user_client,
+                               moderator_client, user, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        url = (f'/api/v1/titles/{titles[1]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.NOT_FOUND, (
+            'Проверьте, что запрос комментариев к отзыву, который не '
+            'относится к произведению из URL, возвращает ответ со статусом '
+            '404.'
+        )
+        response = user_client.post(url, data={'text': 'Мимо'})
+        assert response.status_code == HTTPStatus.NOT_FOUND
+
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               f'{reviews[0]["id"]}/comments/')
+        assert count_queries(client, url) <= 3, (
+            f'Проверьте, что GET-запрос к `{url}` загружает отзыв и авторов '
+            'комментариев без отдельного запроса на каждый объект.'
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        assert count_queries(client, url) <= 3
+
+    def test_06_title_stats(self, client, admin_client, user_client,
+                            moderator_client, user, moderator):
+        authors_map = {user: user_client, moderator: moderator_client}
+        reviews, titles = create_reviews(admin_client, authors_map)
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        moderator_client.patch(
+            f'{title_url}reviews/{reviews[1]["id"]}/', data={'score': 9}
+        )
+        url = f'{title_url}stats/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{url}` не найден или возвращает ошибку.'
+        )
+        histogram = {str(score): 0 for score in range(1, 11)}
+        histogram.update({'5': 1, '9': 1})
+        assert response.json() == {
+            'count': 2, 'average': 7.0, 'histogram': histogram
+        }, (
+            f'Проверьте, что `{url}` возвращает число отзывов, среднюю '
+            'оценку и гистограмму с учётом изменённых оценок.'
+        )
+        assert len(context.captured_queries) <= 2
+
+        user_client.delete(f'{title_url}reviews/{reviews[0]["id"]}/')
+        histogram['5'] = 0
+        assert client.get(url).json() == {
+            'count': 1, 'average': 9.0, 'histogram': histogram
+        }
+
+        # Отзывы автора удаляются каскадом, мимо ReviewViewSet.
+        admin_client.delete(f'/api/v1/users/{moderator.username}/')
+        histogram['9'] = 0
+        assert client.get(url).json() == {
+            'count': 0, 'average': None, 'histogram': histogram
+        }, (
+            'Проверьте, что удаление пользователя пересчитывает рейтинг и '
+            'гистограмму оценок произведений, где были его отзывы.'
+        )
+        assert client.get(title_url).json()['rating'] is None
+
+    def test_07_titles_batch(self, client, admin_client, settings):
+        titles, categories, genres = create_titles(admin_client)
+        create_more_titles(admin_client, genres, categories, 5)
+        ids = [titles[1]['id'], 999999, titles[0]['id']]
+        url = f'/api/v1/titles/batch/?ids={",".join(map(str, ids))}'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == HTTPStatus.OK, (
+            f'Эндпоинт `{url}` не найден или возвращает ошибку.'
+        )
+        data = response.json()
+        assert [title['id'] for title in data] == ids[::2], (
+            f'Проверьте, что `{url}` возвращает найденные произведения в '
+            'порядке запроса.'
+        )
+        assert data[1]['genre'] and data[1]['category']
+        assert len(context.captured_queries) <= 2
+
+        settings.TITLES_BATCH_MAX_IDS = 1
+        assert client.get(url).status_code == HTTPStatus.BAD_REQUEST
+        response = client.get('/api/v1/titles/batch/?ids=1,a')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+
+    def test_08_titles_filter_plans(self, admin_client):
+        titles, categories, genres = create_titles(admin_client)
+        create_more_titles(admin_client, genres, categories, 20)
+        out = StringIO()
+        call_command(
+            'explain_titles_filter', current_db=True, strict=True, stdout=out
+        )
+        output = out.getvalue()
+        assert output.count('== ') == 16, (
+            'Проверьте, что команда `explain_titles_filter` выводит план '
+            'для каждого сочетания фильтров TitlesFilter.'
+        )
+        assert 'Every combination is index-backed' in output
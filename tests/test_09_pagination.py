@@ -0,0 +1,83 @@
+from http import HTTPStatus
+
+import pytest
+from django.utils import timezone
+
+from api.pagination import PubDateCursorPagination
+from reviews.models import Review
+from tests.utils import create_reviews, create_titles
+from users.models import User
+
+
+@pytest.mark.django_db(transaction=True)
+class Test09CursorPaginationAPI:
+
+    def test_01_reviews_cursor_pagination(self, client, admin_client,
+                                          user_client, moderator_client,
+                                          user, moderator, admin):
+        authors_map = {
+            admin: admin_client,
+            user: user_client,
+            moderator: moderator_client,
+        }
+        reviews, titles = create_reviews(admin_client, authors_map)
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+
+        response = client.get(url)
+        assert 'count' in response.json(), (
+            f'Проверьте, что без параметра `pagination` эндпоинт `{url}` '
+            'по-прежнему использует пагинацию limit/offset.'
+        )
+
+        response = client.get(f'{url}?pagination=cursor&limit=2')
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert 'count' not in data and data['next'], (
+            f'Проверьте, что запрос к `{url}?pagination=cursor` возвращает '
+            'страницу курсорной пагинации со ссылкой `next`.'
+        )
+        received = [review['id'] for review in data['results']]
+
+        response = client.get(data['next'])
+        data = response.json()
+        received += [review['id'] for review in data['results']]
+        assert data['next'] is None
+        assert received == sorted(
+            (review['id'] for review in reviews), reverse=True
+        ), (
+            f'Проверьте, что курсорная пагинация `{url}` отдаёт все отзывы '
+            'от новых к старым без пропусков и повторов.'
+        )
+
+    def test_02_equal_pub_dates(self, client, admin_client, monkeypatch):
+        titles, _, _ = create_titles(admin_client)
+        User.objects.bulk_create(
+            User(username=f'reader-{number}',
+                 email=f'reader-{number}@yamdb.fake')
+            for number in range(7)
+        )
+        Review.objects.bulk_create(
+            Review(title_id=titles[0]['id'], author=author, text='Отзыв',
+                   score=5)
+            for author in User.objects.filter(username__startswith='reader')
+        )
+        Review.objects.update(pub_date=timezone.now())
+        # Смещение DRF для равных pub_date упёрлось бы в этот предел.
+        monkeypatch.setattr(PubDateCursorPagination, 'offset_cutoff', 1)
+        url = (f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+               '?pagination=cursor&limit=2')
+        received, pages = [], []
+        # С ошибкой курсор зацикливается, поэтому страниц не больше восьми.
+        while url and len(pages) < 8:
+            data = client.get(url).json()
+            pages.append([review['id'] for review in data['results']])
+            received += pages[-1]
+            url = data['next']
+        assert received == sorted(
+            Review.objects.values_list('id', flat=True), reverse=True
+        ), (
+            'Проверьте, что курсорная пагинация не пропускает и не '
+            'повторяет отзывы с одинаковой датой публикации.'
+        )
+        previous = client.get(data['previous']).json()
+        assert [review['id'] for review in previous['results']] == pages[-2]
@@ -0,0 +1,101 @@
+from http import HTTPStatus
+
+import pytest
+from django.core import mail
+from django.core.mail.backends.base import BaseEmailBackend
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from users.models import OutboxEmail
+from users.outbox import claim_pending, deliver_pending
+
+
+@pytest.mark.django_db(transaction=True)
+class Test10OutboxAPI:
+
+    def test_01_signup_queues_email(self, client, settings):
+        settings.EMAIL_OUTBOX_ENABLED = True
+        outbox_before_count = len(mail.outbox)
+        data = {'email': 'queued@yamdb.fake', 'username': 'queued'}
+        response = client.post('/api/v1/auth/signup/', data=data)
+        assert response.status_code == HTTPStatus.OK
+        assert len(mail.outbox) == outbox_before_count, (
+            'Проверьте, что при включённой очереди писем регистрация не '
+            'отправляет письмо синхронно.'
+        )
+        assert OutboxEmail.objects.filter(
+            recipient=data['email'], sent_at__isnull=True
+        ).exists()
+
+        call_command('send_emails', once=True)
+        assert len(mail.outbox) == outbox_before_count + 1, (
+            'Проверьте, что команда `send_emails` отправляет письма из '
+            'очереди.'
+        )
+        assert data['email'] in mail.outbox[-1].to
+        assert not OutboxEmail.objects.filter(sent_at__isnull=True).exists()
+
+    def test_02_failed_email_is_retried_later(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_10_outbox.FailingBackend'
+        message = OutboxEmail.objects.create(
+            subject='subject', body='body', recipient='fail@yamdb.fake'
+        )
+        call_command('send_emails', once=True)
+        message.refresh_from_db()
+        assert message.sent_at is None
+        assert message.attempts == 1 and message.last_error, (
+            'Проверьте, что неудачная отправка увеличивает счётчик попыток '
+            'и сохраняет текст ошибки.'
+        )
+        assert message.next_attempt_at > message.created, (
+            'Проверьте, что повторная отправка откладывается.'
+        )
+
+    def test_03_concurrent_runs_do_not_resend(self, settings):
+        settings.EMAIL_BACKEND = 'tests.test_10_outbox.InterleavingBackend'
+        OutboxEmail.objects.bulk_create(
+            OutboxEmail(subject='code', body='body',
+                        recipient=f'user-{number}@yamdb.fake')
+            for number in range(3)
+        )
+        outbox_before_count = len(mail.outbox)
+        InterleavingBackend.nested_runs = []
+        assert deliver_pending() == 3
+        assert InterleavingBackend.nested_runs == [0], (
+            'Проверьте, что запуск `send_emails` во время отправки другим '
+            'запуском не получает уже забранные письма.'
+        )
+        recipients = [
+            message.to[0] for message in mail.outbox[outbox_before_count:]
+        ]
+        assert sorted(recipients) == sorted(set(recipients))
+        assert len(recipients) == 3
+
+    def test_04_expired_claim_is_retried(self, settings):
+        settings.EMAIL_OUTBOX_CLAIM_TIMEOUT = 0
+        OutboxEmail.objects.create(
+            subject='code', body='body', recipient='crash@yamdb.fake'
+        )
+        # Отправитель забрал письмо и упал, не отметив его.
+        assert len(claim_pending()) == 1
+        assert deliver_pending() == 1, (
+            'Проверьте, что письма упавшего отправителя отправляются после '
+            '`EMAIL_OUTBOX_CLAIM_TIMEOUT`.'
+        )
+
+
+class InterleavingBackend(EmailBackend):
+    """Во время первой отправки запускает ещё одну доставку."""
+    nested_runs = []
+
+    def send_messages(self, email_messages):
+        if not self.nested_runs:
+            self.nested_runs.append(None)
+            self.nested_runs[0] = deliver_pending()
+        return super().send_messages(email_messages)
+
+
+class FailingBackend(BaseEmailBackend):
+
+    def send_messages(self, email_messages):
+        raise ConnectionError('relay is down')
@@ -0,0 +1,78 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from django.utils.http import http_date
+
+from reviews.models import Category
+from tests.utils import create_categories
+
+
+@pytest.mark.django_db(transaction=True)
+class Test11ListCacheAPI:
+
+    @pytest.mark.parametrize('url', (
+        '/api/v1/categories/',
+        '/api/v1/categories/?search=Фильм',
+    ))
+    def test_01_conditional_list(self, client, admin_client, url):
+        create_categories(admin_client)
+        response = client.get(url)
+        assert response.status_code == HTTPStatus.OK
+        etag = response.get('ETag')
+        assert etag, (
+            f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+            'заголовок `ETag`.'
+        )
+
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            cached = client.get(url)
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            f'Проверьте, что GET-запрос к `{url}` с заголовком '
+            '`If-None-Match` возвращает ответ со статусом 304.'
+        )
+        assert cached.status_code == HTTPStatus.OK
+        assert len(context.captured_queries) == 2, (
+            f'Проверьте, что повторные GET-запросы к `{url}` отдаются из '
+            'кеша: в базу уходит только запрос версии списка.'
+        )
+
+        admin_client.post(
+            '/api/v1/categories/', data={'name': 'Фильмы', 'slug': 'movies'}
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что создание категории сбрасывает кеш списка.'
+        )
+        assert response.get('ETag') != etag
+
+        # Изменение мимо API, например из другого воркера или админки.
+        etag = response.get('ETag')
+        Category.objects.filter(slug='movies').update(
+            name='Фильмы и сериалы', updated_at=timezone.now()
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что версия списка берётся из базы данных, а не из '
+            'кеша процесса.'
+        )
+        assert response.get('ETag') != etag
+
+    def test_02_delete_changes_list(self, client, admin_client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/'
+        response = client.get(url)
+        etag = response['ETag']
+        since = http_date()
+        admin_client.delete(f'{url}films/')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(url, HTTP_IF_MODIFIED_SINCE=since)
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что после удаления категории GET-запрос к списку с '
+            '`If-Modified-Since` не возвращает ответ со статусом 304.'
+        )
+        assert len(response.json()['results']) == 1
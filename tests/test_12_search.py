@@ -0,0 +1,45 @@
+from http import HTTPStatus
+
+import pytest
+
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test12SearchAPI:
+    url = '/api/v1/search/'
+
+    def test_01_search(self, client, admin_client, user_client, user):
+        reviews, titles = create_reviews(admin_client, {user: user_client})
+
+        response = client.get(self.url)
+        assert response.status_code == HTTPStatus.BAD_REQUEST, (
+            f'Проверьте, что GET-запрос к `{self.url}` без параметра `q` '
+            'возвращает ответ со статусом 400.'
+        )
+
+        response = client.get(self.url, {'q': 'термин'})
+        assert response.status_code == HTTPStatus.OK
+        data = response.json()
+        assert [title['id'] for title in data['titles']] == [
+            titles[0]['id']
+        ], (
+            f'Проверьте, что GET-запрос к `{self.url}` находит произведения '
+            'по началу слова в названии.'
+        )
+
+        response = client.get(self.url, {'q': 'review', 'type': 'reviews'})
+        data = response.json()
+        assert list(data) == ['reviews']
+        assert data['reviews'][0]['id'] == reviews[0]['id']
+
+        admin_client.patch(
+            f'/api/v1/titles/{titles[1]["id"]}/', data={'name': 'Орешек'}
+        )
+        response = client.get('/api/v1/titles/', {'q': 'орешек'})
+        assert [title['id'] for title in response.json()['results']] == [
+            titles[1]['id']
+        ], (
+            'Проверьте, что параметр `q` у `/api/v1/titles/` ищет по '
+            'актуальному названию произведения.'
+        )
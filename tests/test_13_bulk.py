@@ -0,0 +1,128 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Title
+from tests.utils import create_categories, create_genre, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test13BulkAPI:
+
+    def test_01_bulk_permissions(self, client, user_client):
+        for url in ('/api/v1/titles/bulk/', '/api/v1/genres/bulk/',
+                    '/api/v1/categories/bulk/'):
+            for api_client in (client, user_client):
+                response = api_client.post(
+                    url, data='[]', content_type='application/json'
+                )
+                assert response.status_code in (
+                    HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN
+                ), (
+                    f'Проверьте, что пакетная запись через `{url}` доступна '
+                    'только администратору.'
+                )
+
+    def test_02_bulk_categories_and_genres(self, admin_client, client):
+        create_categories(admin_client)
+        url = '/api/v1/categories/bulk/'
+        data = [
+            {'name': 'Музыка', 'slug': 'music'},
+            {'name': 'Фильмы снова', 'slug': 'films'},
+            {'name': 'Музыка снова', 'slug': 'music'},
+            {'name': 'Без слага'},
+        ]
+        response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        errors = response.json()
+        assert len(errors) == len(data) and errors[0] == {}, (
+            f'Проверьте, что `{url}` возвращает ошибки по позициям пакета.'
+        )
+        assert 'slug' in errors[3]
+        assert client.get('/api/v1/categories/').json()['count'] == 2, (
+            'Проверьте, что пакет с ошибками не записывается частично.'
+        )
+
+        response = admin_client.post(url, data=data[:1], format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        assert response.json() == data[:1]
+        assert client.get('/api/v1/categories/').json()['count'] == 3, (
+            'Проверьте, что пакетное создание сбрасывает кеш списка.'
+        )
+
+        response = admin_client.patch(
+            url, data=[{'slug': 'music', 'name': 'Музыка и звук'}],
+            format='json'
+        )
+        assert response.json() == [{'slug': 'music', 'name': 'Музыка и звук'}]
+
+        url = '/api/v1/genres/bulk/'
+        create_genre(admin_client)
+        response = admin_client.delete(
+            url, data=['horror', 'comedy'], format='json'
+        )
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get('/api/v1/genres/').json()['count'] == 1
+
+    def test_03_bulk_titles(self, admin_client, client):
+        titles, categories, genres = create_titles(admin_client)
+        url = '/api/v1/titles/bulk/'
+        data = [
+            {'name': f'Пакет {number}', 'year': 2000 + number,
+             'category': categories[number % 2]['slug'],
+             'genre': [genre['slug'] for genre in genres[:number % 3 + 1]]}
+            for number in range(20)
+        ]
+        with CaptureQueriesContext(connection) as context:
+            response = admin_client.post(url, data=data, format='json')
+        assert response.status_code == HTTPStatus.CREATED
+        created = response.json()
+        assert [title['name'] for title in created] == [
+            title['name'] for title in data
+        ]
+        assert created[2]['genre'] == [genre['slug'] for genre in genres]
+        slug_queries = [
+            query for query in context.captured_queries
+            if '"slug" IN' in query['sql']
+        ]
+        assert len(slug_queries) <= 2, (
+            f'Проверьте, что `{url}` ищет категории и жанры одним запросом '
+            'на пакет.'
+        )
+        inserts = [
+            query for query in context.captured_queries
+            if query['sql'].startswith('INSERT INTO "reviews_title"')
+        ]
+        assert len(inserts) == 1, (
+            f'Проверьте, что `{url}` вставляет произведения одним запросом.'
+        )
+        assert {
+            title['id']: title['name'] for title in created
+        } == dict(Title.objects.filter(
+            pk__in=[title['id'] for title in created]
+        ).values_list('id', 'name')), (
+            'Проверьте, что в ответе указаны id созданных произведений.'
+        )
+
+        response = admin_client.patch(url, data=[
+            {'id': created[0]['id'], 'genre': [genres[2]['slug']]},
+            {'id': titles[0]['id'], 'year': 1985},
+        ], format='json')
+        assert response.status_code == HTTPStatus.OK
+        response = client.get(f'/api/v1/titles/{created[0]["id"]}/')
+        assert response.json()['genre'] == [genres[2]]
+
+        response = admin_client.patch(url, data=[
+            {'id': titles[0]['id'], 'category': 'missing'},
+            {'id': 999999},
+        ], format='json')
+        assert response.status_code == HTTPStatus.BAD_REQUEST
+        assert 'category' in response.json()[0]
+        assert 'id' in response.json()[1]
+
+        ids = [title['id'] for title in created]
+        response = admin_client.delete(url, data=ids, format='json')
+        assert response.status_code == HTTPStatus.NO_CONTENT
+        assert client.get('/api/v1/titles/').json()['count'] == 2
@@ -0,0 +1,129 @@
+import sqlite3
+from http import HTTPStatus
+
+import pytest
+from django.core.cache import cache
+from django.core.checks import run_checks
+from django.db import connection, connections
+
+from api.bulk import insert_all
+from api.replicas import replica_reads
+from reviews.models import Category
+from tests.utils import create_categories, create_titles
+
+
+@pytest.fixture
+def replicate(settings, tmp_path):
+    """Реплика в отдельном файле SQLite, догоняющая primary по вызову."""
+    path = tmp_path / 'replica.sqlite3'
+    connections.databases['replica'] = {
+        'ENGINE': 'django.db.backends.sqlite3', 'NAME': str(path),
+    }
+    settings.DATABASE_REPLICAS = ['replica']
+
+    def copy_primary():
+        connection.ensure_connection()
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+
+    yield copy_primary
+    connections['replica'].close()
+    del connections['replica']
+    del connections.databases['replica']
+
+
+@pytest.mark.django_db(transaction=True)
+class Test14ReplicasAPI:
+    url = '/api/v1/titles/'
+
+    def test_01_safe_methods_read_from_replica(self, client, admin_client,
+                                               replicate):
+        _, categories, genres = create_titles(admin_client)
+        replicate()
+        cache.clear()
+        assert client.get(self.url).json()['count'] == 2
+
+        response = admin_client.post(self.url, data={
+            'name': 'Чужой', 'year': 1979, 'genre': [genres[0]['slug']],
+            'category': categories[0]['slug'],
+        })
+        assert response.status_code == HTTPStatus.CREATED
+        assert client.get(self.url).json()['count'] == 2, (
+            'Проверьте, что безопасные запросы читают данные с реплики.'
+        )
+        assert admin_client.get(self.url).json()['count'] == 3, (
+            'Проверьте, что после записи клиент читает с primary, пока не '
+            'истечёт REPLICA_STICKINESS.'
+        )
+
+        cache.clear()
+        assert admin_client.get(self.url).json()['count'] == 2
+        replicate()
+        assert client.get(self.url).json()['count'] == 3
+
+    def test_02_writes_go_to_primary(self, client, admin_client, replicate,
+                                     settings):
+        titles, _, _ = create_titles(admin_client)
+        replicate()
+        settings.REPLICA_STICKINESS = 0
+        url = f'{self.url}{titles[0]["id"]}/'
+        response = admin_client.patch(url, data={'year': 1991})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['year'] == 1991
+        assert client.get(url).json()['year'] == 1984
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT year FROM reviews_title WHERE id = %s',
+                [titles[0]['id']]
+            )
+            assert cursor.fetchone() == (1991,)
+
+    def test_03_shared_cache_check(self, settings, tmp_path):
+        settings.DATABASE_REPLICAS = ['replica']
+        ids = {message.id for message in run_checks()}
+        assert 'api.W001' in ids, (
+            'Проверьте, что с репликами и кешем в памяти процесса '
+            '`manage.py check` выдаёт предупреждение.'
+        )
+        settings.CACHES = {'default': {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': str(tmp_path),
+        }}
+        assert 'api.W001' not in {message.id for message in run_checks()}
+
+    def test_04_search_reads_from_replica(self, client, admin_client,
+                                          replicate):
+        titles, _, _ = create_titles(admin_client)
+        replicate()
+        response = admin_client.patch(
+            f'{self.url}{titles[0]["id"]}/', data={'name': 'Чужой'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        response = client.get('/api/v1/search/', {'q': 'Терминатор'})
+        assert response.status_code == HTTPStatus.OK
+        assert [title['id'] for title in response.json()['titles']] == [
+            titles[0]['id']
+        ], (
+            'Проверьте, что полнотекстовый поиск читает с той же базы, '
+            'что и остальные безопасные запросы.'
+        )
+
+    def test_05_insert_all_on_primary(self, admin_client, replicate):
+        replicate()
+        create_categories(admin_client)
+        token = replica_reads.set(True)
+        try:
+            categories = insert_all(Category, [
+                Category(name='Мультфильм', slug='cartoons'),
+                Category(name='Сериал', slug='series'),
+            ])
+        finally:
+            replica_reads.reset(token)
+        assert [category.pk for category in categories] == [
+            Category.objects.get(slug=slug).pk
+            for slug in ('cartoons', 'series')
+        ], (
+            'Проверьте, что `insert_all` восстанавливает id по той же базе, '
+            'в которую записал объекты.'
+        )
@@ -0,0 +1,97 @@
+import pytest
+from django.core.exceptions import ImproperlyConfigured
+from django.core.signals import request_started
+from django.db import connection
+
+from api_yamdb.cache_settings import parse_cache_url
+from api_yamdb.db_settings import database_settings, parse_database_url
+
+
+class Test15DatabaseSettings:
+
+    @pytest.mark.parametrize('url, expected', (
+        ('sqlite:///db.sqlite3', {'NAME': 'db.sqlite3'}),
+        ('sqlite:////var/lib/yamdb.sqlite3',
+         {'NAME': '/var/lib/yamdb.sqlite3'}),
+        ('/tmp/replica.sqlite3', {'NAME': '/tmp/replica.sqlite3'}),
+        ('postgres://yamdb:p%40ss@db:5432/yamdb?sslmode=require', {
+            'ENGINE': 'django.db.backends.postgresql', 'NAME': 'yamdb',
+            'USER': 'yamdb', 'PASSWORD': 'p@ss', 'HOST': 'db',
+            'PORT': '5432', 'OPTIONS': {'sslmode': 'require'},
+        }),
+    ))
+    def test_01_parse_database_url(self, url, expected):
+        database = parse_database_url(url)
+        assert database.items() >= expected.items(), (
+            f'Проверьте разбор адреса базы `{url}`.'
+        )
+
+    def test_02_settings_from_environment(self, monkeypatch):
+        monkeypatch.setenv('DB_CONN_MAX_AGE', '300')
+        monkeypatch.setenv('DB_SQLITE_PRAGMAS', 'synchronous=FULL')
+        database = database_settings('sqlite:///db.sqlite3')
+        assert database['CONN_MAX_AGE'] == 300
+        assert database['PRAGMAS']['synchronous'] == 'FULL'
+        assert database['PRAGMAS']['journal_mode'] == 'WAL'
+
+        monkeypatch.setenv('DB_SQLITE_PRAGMAS', 'synchronous')
+        with pytest.raises(ImproperlyConfigured):
+            database_settings('sqlite:///db.sqlite3')
+        with pytest.raises(ImproperlyConfigured):
+            parse_database_url('oracle://db/yamdb')
+
+    @pytest.mark.django_db
+    def test_03_sqlite_pragmas_applied(self):
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA busy_timeout')
+            assert cursor.fetchone() == (5000,), (
+                'Проверьте, что PRAGMA из настроек применяются к каждому '
+                'новому соединению SQLite.'
+            )
+            cursor.execute('PRAGMA synchronous')
+            assert cursor.fetchone() == (1,)
+
+    @pytest.mark.django_db(transaction=True)
+    def test_04_connection_checked_after_error(self, client, monkeypatch):
+        checks, closed = [], []
+        connection.ensure_connection()
+        monkeypatch.setattr(connection, 'is_usable',
+                            lambda: checks.append(True) and False)
+        # Соединение с базой в памяти SQLite не закрывает, поэтому
+        # проверяется сам вызов.
+        monkeypatch.setattr(connection, 'close', lambda: closed.append(True))
+        request_started.send(sender=None)
+        client.get('/api/v1/categories/')
+        assert not checks and not closed, (
+            'Проверьте, что исправное соединение не проверяется отдельным '
+            'запросом к базе на каждый HTTP-запрос.'
+        )
+        # Ошибка в соединении: Django проверит его в начале следующего
+        # запроса и закроет неработающее.
+        monkeypatch.setattr(connection, 'errors_occurred', True)
+        request_started.send(sender=None)
+        assert checks and closed, (
+            'Проверьте, что соединение после ошибки проверяется и '
+            'закрывается перед следующим запросом.'
+        )
+
+    @pytest.mark.parametrize('url, expected', (
+        ('locmem://', {'BACKEND': 'django.core.cache.backends.locmem.'
+                                  'LocMemCache'}),
+        ('file:///var/tmp/yamdb', {'LOCATION': '/var/tmp/yamdb'}),
+        ('db://yamdb_cache', {'LOCATION': 'yamdb_cache'}),
+        ('memcached://cache1:11211,cache2:11211', {
+            'BACKEND': 'django.core.cache.backends.memcached.'
+                       'PyMemcacheCache',
+            'LOCATION': ['cache1:11211', 'cache2:11211'],
+        }),
+    ))
+    def test_05_parse_cache_url(self, url, expected):
+        assert parse_cache_url(url).items() >= expected.items(), (
+            f'Проверьте разбор адреса кеша `{url}`.'
+        )
+
+    @pytest.mark.parametrize('url', ('redis://cache:6379', 'file://'))
+    def test_06_invalid_cache_url(self, url):
+        with pytest.raises(ImproperlyConfigured):
+            parse_cache_url(url)
@@ -0,0 +1,124 @@
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+
+import pytest
+from django.db import connection, connections
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken
+
+from reviews.models import Category, Review, Title
+from users.models import User
+
+WRITERS = 8
+AUTHORS_PER_WRITER = 5
+
+
+@pytest.fixture
+def file_database(tmp_path, monkeypatch):
+    """Переключает новые соединения на копию тестовой базы в файле.
+
+    База SQLite в памяти не переносит параллельных писателей, а с файлом
+    в режиме WAL потоки работают так же, как воркеры сервера. Соединение
+    основного потока остаётся на базе в памяти.
+    """
+    path = tmp_path / 'concurrent.sqlite3'
+    connection.ensure_connection()
+
+    def copy():
+        target = sqlite3.connect(path)
+        connection.connection.backup(target)
+        target.close()
+        monkeypatch.setitem(connection.settings_dict, 'NAME', str(path))
+
+    yield copy
+
+
+def in_thread(function):
+    """Выполняет function в потоке со своим соединением с базой."""
+    def run():
+        try:
+            return function()
+        finally:
+            connections.close_all()
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(run).result()
+
+
+def write_reviews(title_id, authors):
+    """POST, PATCH и часть DELETE отзывов через API от имени authors.
+
+    Возвращает оценки, которые должны остаться: автор -> оценка или None,
+    и ответы с неожиданным статусом.
+    """
+    url = f'/api/v1/titles/{title_id}/reviews/'
+    scores, failures = {}, []
+    try:
+        for number, author in enumerate(authors):
+            client = APIClient()
+            client.credentials(
+                HTTP_AUTHORIZATION=f'Bearer {AccessToken.for_user(author)}'
+            )
+            response = client.post(
+                url, data={'text': 'Отзыв', 'score': number % 10 + 1}
+            )
+            if response.status_code != HTTPStatus.CREATED:
+                failures.append(response.status_code)
+                continue
+            review_url = f'{url}{response.json()["id"]}/'
+            score = (author.pk * 7) % 10 + 1
+            response = client.patch(review_url, data={'score': score})
+            if response.status_code != HTTPStatus.OK:
+                failures.append(response.status_code)
+            scores[author.pk] = score
+            if number % 3 == 0:
+                response = client.delete(review_url)
+                if response.status_code != HTTPStatus.NO_CONTENT:
+                    failures.append(response.status_code)
+                scores[author.pk] = None
+    finally:
+        connections.close_all()
+    return scores, failures
+
+
+@pytest.mark.django_db(transaction=True)
+class Test16ConcurrencyAPI:
+
+    def test_01_parallel_review_requests(self, file_database):
+        category = Category.objects.create(name='Фильм', slug='film')
+        title = Title.objects.create(
+            name='Терминатор', year=1984, category=category
+        )
+        User.objects.bulk_create(
+            User(username=f'writer-{number}',
+                 email=f'writer-{number}@yamdb.fake')
+            for number in range(WRITERS * AUTHORS_PER_WRITER)
+        )
+        authors = list(User.objects.order_by('id'))
+        file_database()
+
+        with ThreadPoolExecutor(max_workers=WRITERS) as executor:
+            results = list(executor.map(
+                write_reviews,
+                [title.pk] * WRITERS,
+                [authors[number::WRITERS] for number in range(WRITERS)],
+            ))
+        failures = [status for _, failed in results for status in failed]
+        assert not failures, (
+            'Проверьте, что параллельные запросы к отзывам на SQLite не '
+            f'падают с ошибкой «database is locked»: {failures}.'
+        )
+
+        scores = [
+            score for written, _ in results for score in written.values()
+            if score is not None
+        ]
+        title = in_thread(lambda: Title.objects.get(pk=title.pk))
+        assert title.rating_count == len(scores) == in_thread(
+            Review.objects.filter(title_id=title.pk).count
+        ), 'Проверьте, что число отзывов учтено без потерь.'
+        assert title.rating == pytest.approx(sum(scores) / len(scores)), (
+            'Проверьте, что рейтинг произведения верен после параллельных '
+            'созданий, изменений и удалений отзывов.'
+        )
@@ -0,0 +1,91 @@
+import asyncio
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.test import AsyncClient, AsyncRequestFactory
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api import async_reads
+from api.views import ReviewViewSet, TitleViewSet
+from tests.utils import create_reviews
+
+
+@pytest.mark.django_db(transaction=True)
+class Test17AsyncReadsAPI:
+
+    def test_01_async_views(self, client, admin, admin_client, user_client,
+                            user, settings, monkeypatch):
+        _, titles = create_reviews(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        settings.ASYNC_READS = True
+        threads = set()
+        handle_read = async_reads.handle_read
+
+        def recording_handle_read(*args, **kwargs):
+            threads.add(threading.current_thread().name)
+            return handle_read(*args, **kwargs)
+
+        monkeypatch.setattr(async_reads, 'handle_read', recording_handle_read)
+        view = ReviewViewSet.as_view({'get': 'list', 'post': 'create'})
+        assert asyncio.iscoroutinefunction(view), (
+            'Проверьте, что при ASYNC_READS представления ReviewViewSet '
+            'асинхронные.'
+        )
+        url = f'/api/v1/titles/{titles[0]["id"]}/reviews/'
+        factory = AsyncRequestFactory()
+        response = async_to_sync(view)(
+            factory.get(f'{url}?limit=1'), title_id=titles[0]['id']
+        )
+        assert response.status_code == HTTPStatus.OK
+        assert json.loads(response.content) == client.get(
+            url, {'limit': 1}
+        ).json(), (
+            'Проверьте, что асинхронный список отзывов совпадает с '
+            'синхронным, включая пагинацию.'
+        )
+        assert threads and all(
+            name.startswith('api-read') for name in threads
+        ), 'Проверьте, что чтение выполняется в пуле read_executor.'
+
+        response = async_to_sync(view)(
+            factory.post(url, {'text': 'Отзыв', 'score': 5},
+                         content_type='application/json'),
+            title_id=titles[1]['id'],
+        )
+        assert response.status_code == HTTPStatus.UNAUTHORIZED, (
+            'Проверьте, что права доступа работают в асинхронном режиме.'
+        )
+        request = factory.post(url, {'text': 'Отзыв', 'score': 5},
+                               content_type='application/json')
+        request.META['HTTP_AUTHORIZATION'] = (
+            f'Bearer {AccessToken.for_user(user)}'
+        )
+        response = async_to_sync(view)(request, title_id=titles[1]['id'])
+        assert response.status_code == HTTPStatus.CREATED
+
+        detail = TitleViewSet.as_view({'get': 'retrieve'})
+        response = async_to_sync(detail)(
+            factory.get(f'/api/v1/titles/{titles[0]["id"]}/'),
+            pk=titles[0]['id'],
+        )
+        assert json.loads(response.content)['rating'] == 5
+
+    def test_02_asgi_client(self, admin_client):
+        create_reviews(admin_client, {})
+
+        async def get():
+            return await AsyncClient().get('/api/v1/titles/')
+
+        response = async_to_sync(get)()
+        assert response.status_code == HTTPStatus.OK
+        assert response.json()['count'] == 2
+
+    def test_03_sync_without_setting(self, settings):
+        settings.ASYNC_READS = False
+        assert not asyncio.iscoroutinefunction(
+            TitleViewSet.as_view({'get': 'list'})
+        )
@@ -0,0 +1,164 @@
+from http import HTTPStatus
+
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review
+from tests.utils import create_comments, create_single_review
+
+
+@pytest.mark.django_db(transaction=True)
+class Test18ConditionalAPI:
+
+    def test_01_not_modified(self, client, admin, admin_client, user,
+                             user_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client, user: user_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        urls = (
+            '/api/v1/titles/',
+            '/api/v1/titles/?year=1984',
+            title_url,
+            f'{title_url}reviews/',
+            review_url,
+            f'{review_url}comments/',
+            f'{review_url}comments/{comments[0]["id"]}/',
+        )
+        for url in urls:
+            response = client.get(url)
+            assert response.status_code == HTTPStatus.OK
+            etag = response.get('ETag')
+            assert etag and etag.startswith('W/'), (
+                f'Проверьте, что ответ на GET-запрос к `{url}` содержит '
+                'слабый `ETag`.'
+            )
+            with CaptureQueriesContext(connection) as context:
+                response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+            assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+                f'Проверьте, что GET-запрос к `{url}` с совпадающим '
+                '`If-None-Match` возвращает ответ со статусом 304.'
+            )
+            assert not response.content
+            assert len(context.captured_queries) <= 2, (
+                f'Проверьте, что ответ 304 на `{url}` отдаётся без загрузки '
+                'и сериализации объектов.'
+            )
+
+    def test_02_etag_changes(self, client, admin, admin_client, user,
+                             user_client, moderator_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        title_url = f'/api/v1/titles/{titles[0]["id"]}/'
+        review_url = f'{title_url}reviews/{reviews[0]["id"]}/'
+        urls = {
+            'titles': '/api/v1/titles/',
+            'title': title_url,
+            'reviews': f'{title_url}reviews/',
+            'comments': f'{review_url}comments/',
+        }
+
+        def changed():
+            etags = {name: client.get(url)['ETag']
+                     for name, url in urls.items()}
+            return etags, {
+                name for name in etags if etags[name] != old.get(name)
+            }
+
+        old = {}
+        old, _ = changed()
+        create_single_review(user_client, titles[0]['id'], 'Отзыв', 1)
+        old, names = changed()
+        assert names == {'titles', 'title', 'reviews'}, (
+            'Проверьте, что новый отзыв меняет `ETag` произведения, списка '
+            'произведений и списка отзывов, но не списка комментариев.'
+        )
+
+        response = moderator_client.patch(
+            f'{review_url}comments/{comments[0]["id"]}/', data={'text': 'Да'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        old, names = changed()
+        assert names == {'comments'}, (
+            'Проверьте, что изменение комментария меняет `ETag` списка '
+            'комментариев.'
+        )
+
+        admin_client.delete('/api/v1/categories/films/')
+        old, names = changed()
+        assert {'titles', 'title'} <= names and 'comments' not in names, (
+            'Проверьте, что удаление категории меняет `ETag` её '
+            'произведений.'
+        )
+
+        response = admin_client.patch(
+            '/api/v1/genres/bulk/',
+            data=[{'slug': 'horror', 'name': 'Хоррор'}], format='json'
+        )
+        assert response.status_code == HTTPStatus.OK
+        old, names = changed()
+        assert {'titles', 'title'} <= names, (
+            'Проверьте, что изменение жанра меняет `ETag` его произведений.'
+        )
+
+        response = admin_client.patch(
+            f'/api/v1/users/{admin.username}/', data={'username': 'renamed'}
+        )
+        assert response.status_code == HTTPStatus.OK
+        old, names = changed()
+        assert {'reviews', 'comments'} <= names, (
+            'Проверьте, что смена имени пользователя меняет `ETag` отзывов '
+            'и комментариев, где оно выводится.'
+        )
+
+    def test_03_if_match(self, client, admin, admin_client):
+        comments, reviews, titles = create_comments(
+            admin_client, {admin: admin_client}
+        )
+        review_url = (
+            f'/api/v1/titles/{titles[0]["id"]}/reviews/{reviews[0]["id"]}/'
+        )
+        for url, data in (
+            (review_url, {'score': 3}),
+            (f'{review_url}comments/{comments[0]["id"]}/', {'text': 'Нет'}),
+        ):
+            etag = client.get(url)['ETag']
+            response = admin_client.patch(url, data=data,
+                                          HTTP_IF_MATCH=etag)
+            assert response.status_code == HTTPStatus.OK, (
+                f'Проверьте, что PATCH-запрос к `{url}` с актуальным '
+                '`If-Match` выполняется.'
+            )
+            assert response['ETag'] == client.get(url)['ETag']
+            response = admin_client.patch(url, data=data,
+                                          HTTP_IF_MATCH=etag)
+            assert response.status_code == HTTPStatus.PRECONDITION_FAILED, (
+                f'Проверьте, что PATCH-запрос к `{url}` с устаревшим '
+                '`If-Match` возвращает ответ со статусом 412.'
+            )
+
+    def test_04_recalculated_ratings(self, client, admin, admin_client,
+                                     user):
+        _, _, titles = create_comments(admin_client, {admin: admin_client})
+        urls = [f'/api/v1/titles/{title["id"]}/' for title in titles[:2]]
+        etags = [client.get(url)['ETag'] for url in urls]
+        Review.objects.create(
+            title_id=titles[0]['id'], author=user, text='Отзыв', score=1
+        )
+        call_command('recalculate_ratings', stdout=StringIO())
+        response = client.get(urls[0], HTTP_IF_NONE_MATCH=etags[0])
+        assert response.status_code == HTTPStatus.OK, (
+            'Проверьте, что `recalculate_ratings` меняет `ETag` '
+            'произведений, рейтинг которых изменился.'
+        )
+        response = client.get(urls[1], HTTP_IF_NONE_MATCH=etags[1])
+        assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+            'Проверьте, что `recalculate_ratings` не меняет `ETag` '
+            'произведений с прежним рейтингом.'
+        )
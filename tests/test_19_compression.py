@@ -0,0 +1,104 @@
+import gzip
+import json
+
+import pytest
+
+from api import compression
+from tests.utils import create_categories, create_titles
+
+
+@pytest.mark.django_db(transaction=True)
+class Test19CompressionAPI:
+    url = '/api/v1/titles/'
+
+    def test_01_gzip(self, client, admin_client, settings):
+        create_titles(admin_client)
+        settings.COMPRESSION_MIN_SIZE = 100
+        plain = client.get(self.url)
+        response = client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br;q=0')
+        assert response['Content-Encoding'] == 'gzip', (
+            f'Проверьте, что ответ на GET-запрос к `{self.url}` сжимается '
+            'в gzip, если клиент его принимает.'
+        )
+        assert int(response['Content-Length']) == len(response.content)
+        assert 'Accept-Encoding' in response['Vary']
+        assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+        for header in ('', 'identity', 'gzip;q=0', 'deflate'):
+            response = client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+            assert not response.has_header('Content-Encoding'), (
+                'Проверьте, что ответ не сжимается без подходящей '
+                f'кодировки в `Accept-Encoding: {header}`.'
+            )
+
+        settings.COMPRESSION_MIN_SIZE = len(plain.content) + 1
+        response = client.get(self.url, HTTP_ACCEPT_ENCODING='gzip')
+        assert not response.has_header('Content-Encoding'), (
+            'Проверьте, что ответы меньше `COMPRESSION_MIN_SIZE` не '
+            'сжимаются.'
+        )
+
+    def test_02_precompressed_cache(self, client, admin_client, settings,
+                                    monkeypatch):
+        create_categories(admin_client)
+        settings.COMPRESSION_MIN_SIZE = 0
+        calls = []
+        compress = compression.compress
+
+        def recording_compress(content, coding):
+            calls.append(coding)
+            return compress(content, coding)
+
+        monkeypatch.setattr(compression, 'compress', recording_compress)
+        url = '/api/v1/categories/'
+        first = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        second = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert second['Content-Encoding'] == 'gzip'
+        assert second.content == first.content
+        assert calls == ['gzip'], (
+            f'Проверьте, что сжатый ответ на `{url}` кешируется вместе со '
+            'списком и не сжимается повторно.'
+        )
+
+        admin_client.post(url, data={'name': 'Музыка', 'slug': 'music'})
+        response = client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        assert len(calls) == 2
+        assert 'music' in gzip.decompress(response.content).decode()
+
+    def test_03_browsable_api_not_cached(self, admin, admin_client, user,
+                                         user_client, settings):
+        create_categories(admin_client)
+        settings.COMPRESSION_MIN_SIZE = 0
+        url = '/api/v1/categories/?format=api'
+        pages = {}
+        clients = ((admin, admin_client), (user, user_client))
+        for account, api_client in clients:
+            response = api_client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+            assert response['Content-Encoding'] == 'gzip'
+            pages[account.email] = gzip.decompress(response.content).decode()
+        for email, page in pages.items():
+            assert [other for other in pages if other in page] == [email], (
+                f'Проверьте, что сжатая страница browsable API `{url}` не '
+                'отдаётся из кеша другому пользователю.'
+            )
+
+    def test_04_brotli(self, client, admin_client, settings):
+        brotli = pytest.importorskip('brotli')
+        create_titles(admin_client)
+        settings.COMPRESSION_MIN_SIZE = 100
+        response = client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, br')
+        assert response['Content-Encoding'] == 'br'
+        assert json.loads(brotli.decompress(response.content))['count'] == 2
+
+
+@pytest.mark.parametrize('header, coding', (
+    ('gzip', 'gzip'),
+    ('GZIP;q=0.5, identity', 'gzip'),
+    ('*', compression.CODINGS[0]),
+    ('*, gzip;q=0', 'br' if compression.brotli else None),
+    ('gzip;q=0', None),
+    ('gzip;q=abc', None),
+    ('', None),
+))
+def test_19_negotiate(header, coding):
+    assert compression.negotiate(header) == coding
@@ -0,0 +1,111 @@
+import datetime
+import uuid
+from decimal import Decimal
+from io import BytesIO
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+
+from api import parsers, renderers
+from api.parsers import FastJSONParser
+from api.renderers import FastJSONRenderer
+from tests.utils import create_reviews
+
+DATA = {
+    'aware': datetime.datetime(2024, 5, 1, 12, 30, 15, 123456,
+                               tzinfo=timezone.utc),
+    'naive': datetime.datetime(2024, 5, 1, 12, 30),
+    'date': datetime.date(2024, 5, 1),
+    'time': datetime.time(7, 5, 3, 250),
+    'duration': datetime.timedelta(hours=1, microseconds=5),
+    'decimal': Decimal('7.25'),
+    'uuid': uuid.UUID('12345678-1234-5678-1234-567812345678'),
+    'lazy': gettext_lazy('Произведение'),
+    'text': 'Ёж и «кавычки» "\\/',
+    'rating': 7.333333333333333,
+    'scores': {1: 2, 10: 5},
+    'nested': [(1, None, True), {'empty': []}],
+}
+
+
+def test_20_renderer_matches_stdlib():
+    assert FastJSONRenderer().render(DATA) == JSONRenderer().render(DATA), (
+        'Проверьте, что FastJSONRenderer выдаёт те же байты, что и '
+        'JSONRenderer, включая дату, время и Decimal.'
+    )
+    for media_type, context in (
+        ('application/json; indent=2', None),
+        (None, {'indent': 4}),
+    ):
+        assert FastJSONRenderer().render(DATA, media_type, context) == (
+            JSONRenderer().render(DATA, media_type, context)
+        )
+    assert FastJSONRenderer().render({'big': 2 ** 70}) == b'{"big":%d}' % (
+        2 ** 70
+    )
+    assert FastJSONRenderer().render(None) == b''
+
+
+def test_20_parser_matches_stdlib():
+    content = JSONRenderer().render(DATA)
+    assert FastJSONParser().parse(BytesIO(content)) == (
+        JSONParser().parse(BytesIO(content))
+    )
+    surrogate = b'{"text":"\\ud800"}'
+    assert FastJSONParser().parse(BytesIO(surrogate)) == {'text': '\ud800'}
+    for invalid in (b'{"score":NaN}', b'[1,', b'\xff'):
+        with pytest.raises(ParseError) as fast:
+            FastJSONParser().parse(BytesIO(invalid))
+        with pytest.raises(ParseError) as stdlib:
+            JSONParser().parse(BytesIO(invalid))
+        assert str(fast.value) == str(stdlib.value), (
+            'Проверьте, что FastJSONParser отклоняет те же данные и с тем '
+            'же текстом ошибки, что и JSONParser.'
+        )
+    for number in (2 ** 64, -2 ** 63 - 1, 10 ** 30, 2 ** 64 - 1):
+        content = b'{"id":%d,"score":1.5}' % number
+        parsed = FastJSONParser().parse(BytesIO(content))
+        assert parsed == JSONParser().parse(BytesIO(content))
+        assert type(parsed['id']) is int, (
+            'Проверьте, что FastJSONParser читает целые больше 64 бит как '
+            'int, а не float.'
+        )
+    utf16 = '{"text":"Ёж"}'.encode('utf-16')
+    assert FastJSONParser().parse(
+        BytesIO(utf16), parser_context={'encoding': 'utf-16'}
+    ) == {'text': 'Ёж'}
+
+
+def test_20_without_orjson(monkeypatch):
+    monkeypatch.setattr(renderers, 'orjson', None)
+    monkeypatch.setattr(parsers, 'orjson', None)
+    content = FastJSONRenderer().render(DATA)
+    assert content == JSONRenderer().render(DATA)
+    assert FastJSONParser().parse(BytesIO(content)) == (
+        JSONParser().parse(BytesIO(content))
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+def test_20_api_responses(client, admin, admin_client, user, user_client):
+    _, titles = create_reviews(
+        admin_client, {admin: admin_client, user: user_client}
+    )
+    for url in ('/api/v1/titles/',
+                f'/api/v1/titles/{titles[0]["id"]}/reviews/'):
+        response = client.get(url)
+        assert response.content == JSONRenderer().render(response.data), (
+            f'Проверьте, что ответ на `{url}` совпадает с выводом '
+            'JSONRenderer.'
+        )
+    response = admin_client.post(
+        '/api/v1/titles/', {'name': 'Ёж', 'year': 2000, 'category': 'films',
+                            'genre': ['horror']},
+        format='json',
+    )
+    assert response.status_code == 201
+    assert response.json()['name'] == 'Ёж'
@@ -0,0 +1,175 @@
+import asyncio
+import contextvars
+import json
+import threading
+from http import HTTPStatus
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api import views
+from api.async_reads import StreamingASGIHandler, ThreadedIterator
+from tests.utils import create_comments
+
+variable = contextvars.ContextVar('variable', default=None)
+
+
+async def asgi_get(url):
+    """GET через ASGI-приложение, тело ответа собирается целиком."""
+    path, _, query = url.partition('?')
+    scope = {
+        'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+        'method': 'GET', 'scheme': 'http', 'path': path,
+        'raw_path': path.encode(), 'query_string': query.encode(),
+        'headers': [(b'host', b'testserver')],
+        'client': ('127.0.0.1', 0), 'server': ('testserver', 80),
+    }
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    await StreamingASGIHandler()(scope, receive, send)
+    return messages[0]['status'], b''.join(
+        message.get('body', b'') for message in messages[1:]
+    )
+
+
+@pytest.mark.django_db(transaction=True)
+class Test21ExportAPI:
+
+    def export(self, admin_client, authors_map):
+        comments, reviews, titles = create_comments(admin_client, authors_map)
+        return f'/api/v1/titles/{titles[0]["id"]}/reviews/', reviews
+
+    def test_01_reviews(self, client, admin, admin_client, user, user_client,
+                        moderator, moderator_client, settings):
+        url, reviews = self.export(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        settings.EXPORT_CHUNK_SIZE = 2
+        response = client.get(f'{url}export/')
+        assert response.status_code == HTTPStatus.OK
+        assert response.streaming, (
+            f'Проверьте, что `{url}export/` отдаёт ответ потоком.'
+        )
+        assert response['Content-Type'] == 'application/x-ndjson'
+        lines = b''.join(response.streaming_content).splitlines()
+        assert [json.loads(line) for line in lines] == [
+            client.get(f'{url}{review["id"]}/').json() for review in reviews
+        ], (
+            f'Проверьте, что `{url}export/` отдаёт по строке на каждый '
+            'отзыв в том же формате, что и API отзывов.'
+        )
+
+        response = client.get(f'{url}export/', {'comments': 'true'})
+        rows = [json.loads(line) for line in b''.join(
+            response.streaming_content
+        ).splitlines()]
+        comments_url = f'{url}{reviews[0]["id"]}/comments/'
+        assert rows[0]['comments'] == client.get(comments_url).json()[
+            'results'
+        ], 'Проверьте, что с `?comments=true` у отзыва есть комментарии.'
+        assert all(row['comments'] == [] for row in rows[1:])
+
+        assert client.get(
+            '/api/v1/titles/0/reviews/export/'
+        ).status_code == HTTPStatus.NOT_FOUND
+
+    def test_02_queries_per_chunk(self, client, admin, admin_client, user,
+                                  user_client, moderator, moderator_client):
+        url, _ = self.export(admin_client, {
+            admin: admin_client, user: user_client,
+            moderator: moderator_client,
+        })
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}export/', {'comments': 'true'})
+            rows = b''.join(response.streaming_content).splitlines()
+        assert len(rows) == 3
+        assert len(context.captured_queries) <= 4, (
+            'Проверьте, что выгрузка загружает авторов и комментарии одним '
+            'запросом на часть отзывов, а не по запросу на отзыв.'
+        )
+
+    def test_03_asgi(self, admin, admin_client):
+        url, reviews = self.export(admin_client, {admin: admin_client})
+        status, body = async_to_sync(asgi_get)(f'{url}export/?comments=1')
+        assert status == HTTPStatus.OK
+        rows = [json.loads(line) for line in body.splitlines()]
+        assert [row['id'] for row in rows] == [reviews[0]['id']], (
+            'Проверьте, что выгрузка работает под ASGI, где ответ '
+            'перебирается в цикле событий.'
+        )
+        assert len(rows[0]['comments']) == 1
+
+    def test_04_concurrent_request(self, admin, admin_client, user,
+                                   user_client, settings, monkeypatch):
+        url, reviews = self.export(admin_client, {
+            admin: admin_client, user: user_client,
+        })
+        settings.EXPORT_CHUNK_SIZE = 1
+        answered = threading.Event()
+        waited = []
+        export_reviews = views.export_reviews
+
+        def export_after_request(*args, **kwargs):
+            parts = export_reviews(*args, **kwargs)
+            yield next(parts)
+            # Выгрузка продолжится, только когда другой запрос получит
+            # ответ, то есть пока она идёт, цикл событий свободен.
+            waited.append(answered.wait(timeout=5))
+            yield from parts
+
+        monkeypatch.setattr(views, 'export_reviews', export_after_request)
+
+        async def other_request():
+            status, _ = await asgi_get('/api/v1/titles/')
+            answered.set()
+            return status
+
+        async def run():
+            return await asyncio.gather(
+                asgi_get(f'{url}export/'), other_request()
+            )
+
+        (status, body), other_status = async_to_sync(run)()
+        assert status == other_status == HTTPStatus.OK
+        assert waited == [True], (
+            'Проверьте, что во время выгрузки отзывов под ASGI другие '
+            'запросы выполняются, а не ждут её окончания.'
+        )
+        assert len(body.splitlines()) == len(reviews)
+
+
+def test_21_threaded_iterator():
+    threads = []
+
+    def parts():
+        threads.append((threading.current_thread(), variable.get()))
+        yield 1
+        raise ValueError('ошибка')
+
+    async def consume():
+        variable.set('запрос')
+        result = []
+        with pytest.raises(ValueError):
+            async for part in ThreadedIterator(parts()):
+                result.append(part)
+        return result, threading.current_thread()
+
+    result, loop_thread = async_to_sync(consume)()
+    assert result == [1]
+    assert threads[0][0] is not loop_thread, (
+        'Проверьте, что ThreadedIterator перебирает генератор в отдельном '
+        'потоке.'
+    )
+    assert threads[0][1] == 'запрос', (
+        'Проверьте, что поток ThreadedIterator получает contextvars того, '
+        'кто начал перебор.'
+    )
@@ -0,0 +1,124 @@
+import csv
+from collections import defaultdict
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError, call_command
+from django.db.models.query import QuerySet
+from django.utils.dateparse import parse_datetime
+
+from reviews.management.commands.load_csv import CSV_DATA, DEFAULT_DATA_DIR
+from reviews.models import Comment, ImportChunk, Review, Title
+from users.models import User
+
+
+def read_csv(name):
+    with open(DEFAULT_DATA_DIR / name, encoding='utf-8', newline='') as file:
+        return list(csv.DictReader(file))
+
+
+@pytest.mark.django_db(transaction=True)
+class Test22LoadCsv:
+
+    def test_01_load(self):
+        call_command('load_csv', stdout=StringIO())
+        for model, name, _ in CSV_DATA:
+            assert model.objects.count() == len(read_csv(name)), (
+                f'Проверьте, что `load_csv` загружает все строки {name}.'
+            )
+
+        for row in read_csv('titles.csv'):
+            title = Title.objects.get(pk=row['id'])
+            assert str(title.category_id) == row['category']
+        genres = defaultdict(set)
+        for row in read_csv('genre_title.csv'):
+            genres[int(row['title_id'])].add(int(row['genre_id']))
+        for title_id, genre_ids in genres.items():
+            assert set(Title.objects.get(pk=title_id).genre.values_list(
+                'id', flat=True
+            )) == genre_ids, (
+                'Проверьте, что `load_csv` связывает произведения с жанрами.'
+            )
+
+        for model, name in ((Review, 'review.csv'),
+                            (Comment, 'comments.csv')):
+            for row in read_csv(name):
+                obj = model.objects.get(pk=row['id'])
+                assert str(obj.author_id) == row['author']
+                assert obj.author.username
+                assert obj.pub_date == parse_datetime(row['pub_date']), (
+                    f'Проверьте, что `load_csv` сохраняет `pub_date` из '
+                    f'{name}, а не время загрузки.'
+                )
+
+        scores = defaultdict(list)
+        for row in read_csv('review.csv'):
+            scores[int(row['title_id'])].append(int(row['score']))
+        for title in Title.objects.all():
+            expected = scores.get(title.pk)
+            assert title.rating_count == len(expected or ())
+            assert title.rating == (
+                sum(expected) / len(expected) if expected else None
+            ), 'Проверьте, что после загрузки рейтинги пересчитаны.'
+
+        users = User.objects.count()
+        call_command('load_csv', stdout=StringIO())
+        assert User.objects.count() == users, (
+            'Проверьте, что повторный запуск `load_csv` не дублирует данные.'
+        )
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        assert user.pk > max(int(row['id']) for row in read_csv('users.csv'))
+
+    def test_02_resume_after_failure(self, monkeypatch):
+        bulk_create = QuerySet.bulk_create
+        calls = []
+
+        def failing_bulk_create(queryset, objs, *args, **kwargs):
+            if queryset.model is Review:
+                calls.append(len(objs))
+                if fail and len(calls) == 3:
+                    raise RuntimeError('Сбой загрузки')
+            return bulk_create(queryset, objs, *args, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'bulk_create', failing_bulk_create)
+        options = {'resumable': True, 'chunk_size': 20, 'batch_size': 20}
+        fail = True
+        with pytest.raises(RuntimeError):
+            call_command('load_csv', stdout=StringIO(), **options)
+        # Части до сбоя и уже отправленные в работу после него
+        # сохранены вместе с отметками, упавшая часть откатилась.
+        chunks = ImportChunk.objects.filter(table=Review._meta.label)
+        assert 2 <= chunks.count() < len(calls)
+        assert Review.objects.count() == sum(
+            chunks.values_list('rows', flat=True)
+        ), 'Проверьте, что упавшая часть загрузки откатывается целиком.'
+        done = chunks.count()
+
+        fail = False
+        calls.clear()
+        output = StringIO()
+        call_command('load_csv', stdout=output, **options)
+        reviews = read_csv('review.csv')
+        assert Review.objects.count() == len(reviews), (
+            'Проверьте, что повторный запуск догружает оставшиеся части '
+            'без дублей.'
+        )
+        assert len(calls) == -(-len(reviews) // 20) - done, (
+            'Проверьте, что повторный запуск пропускает загруженные части.'
+        )
+        assert (f'reviews.Review: skipped {done} loaded chunks'
+                in output.getvalue())
+        assert Comment.objects.count() == len(read_csv('comments.csv'))
+
+    def test_03_rerun_with_other_chunks_fails(self):
+        options = {'resumable': True, 'batch_size': 20}
+        call_command('load_csv', stdout=StringIO(), chunk_size=20, **options)
+        reviews = Review.objects.count()
+        with pytest.raises(CommandError, match='--chunk-size 20'):
+            call_command(
+                'load_csv', stdout=StringIO(), chunk_size=30, **options
+            )
+        assert Review.objects.count() == reviews, (
+            'Проверьте, что повторный запуск с другим `--chunk-size` '
+            'падает, а не пропускает чужие диапазоны строк.'
+        )
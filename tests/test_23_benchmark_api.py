@@ -0,0 +1,47 @@
+import json
+from io import StringIO
+
+import pytest
+from django.core.management import CommandError
+
+from api.management.commands import benchmark_api
+from api.management.commands.benchmark_api import ROUTES, Command
+
+FIELDS = {'url', 'p50_ms', 'p95_ms', 'queries', 'bytes'}
+
+
+@pytest.mark.django_db(transaction=True)
+class Test23BenchmarkApi:
+
+    def test_01_smoke(self, tmp_path):
+        benchmark_api.seed(titles=3, reviews=2, comments=1)
+        command = Command(stdout=StringIO())
+        results = command.run_routes(iterations=2)
+        assert list(results) == [name for name, _ in ROUTES], (
+            'Проверьте, что `benchmark_api` замеряет все маршруты.'
+        )
+        for name, row in results.items():
+            assert set(row) == FIELDS, (
+                f'Проверьте поля результата для `{name}`.'
+            )
+            assert row['p95_ms'] >= row['p50_ms'] > 0
+            assert row['bytes'] > 0
+
+        output = tmp_path / 'results.json'
+        command.report(results, {
+            'output': output, 'baseline': output, 'tolerance': 0,
+        })
+        assert json.loads(output.read_text()) == results
+
+        baseline = json.loads(output.read_text())
+        baseline['titles-list']['queries'] -= 1
+        with pytest.raises(CommandError, match='titles-list: queries'):
+            command.compare(results, baseline, tolerance=25)
+
+    def test_02_committed_baseline(self):
+        baseline = json.loads(benchmark_api.BASELINE.read_text())
+        assert list(baseline) == [name for name, _ in ROUTES], (
+            'Проверьте, что baseline в репозитории покрывает все маршруты '
+            '`benchmark_api`.'
+        )
+        assert all(set(row) == FIELDS for row in baseline.values())
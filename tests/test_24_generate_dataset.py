@@ -0,0 +1,88 @@
+import csv
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.utils.dateparse import parse_datetime
+
+from reviews.management.commands.load_csv import CSV_DATA
+from reviews.models import Comment, Review, Title
+from users.models import User
+
+OPTIONS = {
+    'titles': 30, 'users': 40, 'genres': 4, 'categories': 3,
+    'max_reviews': 20, 'zipf': 1.0, 'comments_mean': 1.5, 'seed': 7,
+}
+
+
+def generate_csv(path, **options):
+    call_command('generate_dataset', csv=path, stdout=StringIO(),
+                 **{**OPTIONS, **options})
+    data = {}
+    for _, name, _ in CSV_DATA:
+        with open(path / name, encoding='utf-8', newline='') as file:
+            data[name] = list(csv.DictReader(file))
+    return data
+
+
+@pytest.mark.django_db
+class Test24GenerateDataset:
+
+    def test_01_deterministic(self, tmp_path):
+        first = generate_csv(tmp_path / 'first')
+        assert generate_csv(tmp_path / 'second') == first, (
+            'Проверьте, что `generate_dataset` с одним seed даёт один и тот '
+            'же набор данных.'
+        )
+        assert generate_csv(tmp_path / 'other', seed=8) != first
+
+    def test_02_row_counts(self, tmp_path):
+        data = generate_csv(tmp_path)
+        for name, option in (('users.csv', 'users'),
+                             ('category.csv', 'categories'),
+                             ('genre.csv', 'genres'),
+                             ('titles.csv', 'titles')):
+            assert len(data[name]) == OPTIONS[option], (
+                f'Проверьте число строк в {name}.'
+            )
+        reviews = sum(
+            int(OPTIONS['max_reviews'] / rank ** OPTIONS['zipf'])
+            for rank in range(1, OPTIONS['titles'] + 1)
+        )
+        assert len(data['review.csv']) == reviews, (
+            'Проверьте, что число отзывов на произведение убывает по '
+            'закону Ципфа.'
+        )
+        assert all(
+            row['review_id'] and int(row['review_id']) <= reviews
+            for row in data['comments.csv']
+        )
+
+    @pytest.mark.django_db(transaction=True)
+    def test_03_database_matches_csv(self, tmp_path):
+        data = generate_csv(tmp_path)
+        call_command('generate_dataset', stdout=StringIO(), **OPTIONS)
+        for model, name, _ in CSV_DATA:
+            assert model.objects.count() == len(data[name]), (
+                f'Проверьте, что в базу загружено столько же строк, '
+                f'сколько в {name}.'
+            )
+        for model, name in ((Review, 'review.csv'),
+                            (Comment, 'comments.csv')):
+            for row in data[name]:
+                obj = model.objects.get(pk=row['id'])
+                assert (obj.text, str(obj.author_id), obj.pub_date) == (
+                    row['text'], row['author'], parse_datetime(row['pub_date'])
+                ), (
+                    f'Проверьте, что строки в базе совпадают с {name} при '
+                    'том же seed.'
+                )
+        assert Title.objects.filter(rating__isnull=False).exists()
+
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        assert user.pk > OPTIONS['users'], (
+            'Проверьте, что после загрузки с явными id последовательности '
+            'сдвинуты.'
+        )
+        call_command('generate_dataset', stdout=StringIO(), **OPTIONS)
+        assert Review.objects.count() == 2 * len(data['review.csv'])